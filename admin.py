@@ -1,12 +1,22 @@
 # admin.py
 from django.contrib import admin
-from .models import Customer, Compliance, Template, Employee, Policy, Acknowledgement, PolicyConfiguration, History
+from .models import Customer, Compliance, Template, Employee, Policy, Acknowledgement, PolicyConfiguration, History, Notification
+from .models import PolicyConfigurationSnapshot
 
-class CustomerAdmin(admin.ModelAdmin):
+class SoftDeleteAdmin(admin.ModelAdmin):
+    # Deleted rows stay listed so they can be restored; related-field choices still use the live default manager
+    def get_queryset(self, request):
+        queryset = self.model.all_objects.get_queryset()
+        ordering = self.get_ordering(request)
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+class CustomerAdmin(SoftDeleteAdmin):
     search_fields = ('name',)
     list_display = ('id', 'name', 'is_deleted')
     
-class ComplianceAdmin(admin.ModelAdmin):
+class ComplianceAdmin(SoftDeleteAdmin):
     search_fields = ('compliance_title',)
     list_display = ('id', 'compliance_title', 'is_deleted')
     
@@ -19,15 +29,23 @@ class TemplateAdmin(admin.ModelAdmin):
     
 class EmployeeAdmin(admin.ModelAdmin):
     list_display = ('id', 'name', 'email', 'customer', 'role', 'status', 'created_at', 'updated_at')
+    list_select_related = ('customer',)
     search_fields = ('name', 'role',)
     
 class PolicyAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'version', 'approval_status', 'approved_by',  'created_at', 'updated_at')
+    list_select_related = ('approved_by',)
     search_fields = ('title', 'description',)
     
 class PolicyConfigurationAdmin(admin.ModelAdmin):
     list_display = ('id', 'policy', 'key', 'version', 'status', 'created_at', 'updated_at')
+    list_select_related = ('policy',)
     search_fields = ('title', 'description',)
+
+class PolicyConfigurationSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('id', 'policy', 'version', 'updated_at')
+    list_select_related = ('policy',)
+    readonly_fields = ('policy', 'version', 'configuration', 'created_at', 'updated_at')
     
 # class CustomerPolicyAdmin(admin.ModelAdmin):
 #     list_display = ('id', 'policy', 'version', 'status', 'created_at', 'updated_at')
@@ -35,11 +53,21 @@ class PolicyConfigurationAdmin(admin.ModelAdmin):
     
 class AcknowledgementAdmin(admin.ModelAdmin):
     list_display = ('id', 'policy', 'employee', 'status', 'acknowledgement_type', 'created_at', 'updated_at')
+    list_select_related = ('policy', 'employee')
     search_fields = ('policy', 'employee',)
     
 class HistoryAdmin(admin.ModelAdmin):
     list_display = ('id', 'acknowledgement', 'field', 'updated_at')
+    list_select_related = ('acknowledgement__policy', 'acknowledgement__employee')
     search_fields = ('field', 'status',)
+    # Newest first along history_updated_at_idx; rows past retention are read from exports/history/archive/
+    ordering = ('-updated_at', '-id')
+
+    
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient', 'subject',)
 
 
 admin.site.register(Employee, EmployeeAdmin)
@@ -49,6 +77,8 @@ admin.site.register(Template, TemplateAdmin)
 # admin.site.register(TemplateVersion, TemplateVersionAdmin)
 admin.site.register(Policy, PolicyAdmin)
 admin.site.register(PolicyConfiguration, PolicyConfigurationAdmin)
+admin.site.register(PolicyConfigurationSnapshot, PolicyConfigurationSnapshotAdmin)
 # admin.site.register(CustomerPolicy, CustomerPolicyAdmin)
 admin.site.register(Acknowledgement, AcknowledgementAdmin)
-admin.site.register(History, HistoryAdmin)
\ No newline at end of file
+admin.site.register(History, HistoryAdmin)
+admin.site.register(Notification, NotificationAdmin)
\ No newline at end of file
@@ -0,0 +1,239 @@
+"""
+Rolling archive for the History audit trail.
+Rows older than the retention window are moved out of the table into gzip NDJSON files, one set per calendar
+month of updated_at (history-YYYY-MM-<run>.ndjson.gz), so the table only holds recent history and the archive
+can still be read back for a time range without opening every file. Each file name also carries the
+(updated_at, id) position of its last row, and the newest position is the high-water mark a run starts from,
+so no row is archived twice.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .exports import HISTORY_EXPORT_COLUMNS, export_values
+from .models import History
+
+HISTORY_ARCHIVE_DIR = getattr(settings, 'HISTORY_ARCHIVE_DIR', 'history-archive')
+HISTORY_RETENTION_DAYS = getattr(settings, 'HISTORY_RETENTION_DAYS', 365)
+HISTORY_ARCHIVE_CHUNK_SIZE = getattr(settings, 'HISTORY_ARCHIVE_CHUNK_SIZE', 5000)
+# History rows are inserted when their transaction commits, carrying the updated_at of the change, so a row can
+# appear below the high-water mark after a run has read past it and would then be deleted without being archived.
+# Rows younger than this many days are never archived, which leaves any transaction that long to commit.
+HISTORY_ARCHIVE_MIN_DAYS = getattr(settings, 'HISTORY_ARCHIVE_MIN_DAYS', 1)
+
+# Archived rows carry the same columns as the history export
+HISTORY_ARCHIVE_COLUMNS = HISTORY_EXPORT_COLUMNS
+
+
+def month_start(moment):
+    """First instant (UTC) of the month `moment` falls in; archive files are split on UTC months."""
+    moment = moment.astimezone(dt_timezone.utc)
+    return datetime.combine(date(moment.year, moment.month, 1), time.min, tzinfo=dt_timezone.utc)
+
+
+def next_month(start):
+    return month_start(start + timedelta(days=32))
+
+
+def encode(value):
+    # Full precision, unlike DjangoJSONEncoder, which drops microseconds
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def after_position(position):
+    """Q for rows past `position`, an (updated_at, id) pair in archive order."""
+    return Q(updated_at__gt=position[0]) | Q(updated_at=position[0], id__gt=position[1])
+
+
+def archived_history(before, chunk_size=HISTORY_ARCHIVE_CHUNK_SIZE, after=None):
+    """
+    Rows older than `before` and past the (updated_at, id) position `after`, in (updated_at, id) order, read a
+    chunk at a time along the updated_at index.
+    """
+    queryset = History.objects.filter(updated_at__lt=before)
+    last = after
+    while True:
+        chunk = queryset
+        if last is not None:
+            chunk = chunk.filter(after_position(last))
+        rows = list(export_values(chunk, HISTORY_ARCHIVE_COLUMNS).order_by('updated_at', 'id')[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = (rows[-1]['updated_at'], rows[-1]['id'])
+
+
+POSITION_FORMAT = '%Y%m%dT%H%M%S%f'
+
+
+class ArchiveFile:
+    """
+    One month's archive file, written under a .partial name and only renamed into place once synced. The final
+    name ends with the position of the last row, so the file and the high-water mark appear in the same rename.
+    """
+
+    def __init__(self, directory, month, run):
+        self.month = month
+        self.directory = directory
+        self.partial = os.path.join(directory, f"history-{month:%Y-%m}-{run}.partial")
+        self.name = f"history-{month:%Y-%m}-{run}"
+        self.raw = open(self.partial, 'wb')
+        self.gzip = gzip.GzipFile(fileobj=self.raw, mode='wb')
+        self.rows = 0
+        self.last = None
+
+    def write(self, row):
+        self.gzip.write((json.dumps(row, default=encode) + '\n').encode())
+        self.rows += 1
+        self.last = (row['updated_at'], row['id'])
+
+    def commit(self):
+        self.gzip.close()
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+        self.raw.close()
+        updated_at, pk = self.last
+        position = f"{updated_at.astimezone(dt_timezone.utc):{POSITION_FORMAT}}-{pk}"
+        os.replace(self.partial, os.path.join(self.directory, f"{self.name}-{position}.ndjson.gz"))
+
+    def discard(self):
+        if self.raw.closed:
+            # Already committed; its rows are archived even if deleting them failed
+            return
+        self.gzip.close()
+        self.raw.close()
+        os.remove(self.partial)
+
+
+def read_high_water(directory):
+    """(updated_at, id) of the last row archived into `directory`, from the file names, or None if there is none."""
+    high_water = None
+    for name in os.listdir(directory):
+        if not (name.startswith('history-') and name.endswith('.ndjson.gz')):
+            continue
+        # history-YYYY-MM-<run>-<updated_at>-<id>.ndjson.gz
+        parts = name[:-len('.ndjson.gz')].split('-')
+        if len(parts) != 6:
+            continue
+        position = (datetime.strptime(parts[4], POSITION_FORMAT).replace(tzinfo=dt_timezone.utc), int(parts[5]))
+        if high_water is None or position > high_water:
+            high_water = position
+    return high_water
+
+
+def delete_archived(through, chunk_size=HISTORY_ARCHIVE_CHUNK_SIZE):
+    """
+    Delete the rows up to and including the (updated_at, id) position `through`, which are all in archive files.
+    Each chunk of ids is deleted in its own transaction, and deleting again after an interruption is harmless.
+    """
+    archived = History.objects.exclude(after_position(through)).order_by('updated_at', 'id')
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(archived.values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                return deleted
+            deleted += History.objects.filter(id__in=ids).delete()[0]
+
+
+def archive_history(before, directory=HISTORY_ARCHIVE_DIR, chunk_size=HISTORY_ARCHIVE_CHUNK_SIZE, delete=True):
+    """
+    Move History rows with updated_at before `before` into monthly archive files under `directory`.
+    Each month is written, synced and renamed into place (which moves the high-water mark past its last row)
+    before its rows are deleted. A run starts after the mark and first deletes rows an interrupted run archived
+    but left in the table, so every row ends up in exactly one file. Raises ValueError when `before` is less than
+    HISTORY_ARCHIVE_MIN_DAYS ago. Returns {month: rows archived}.
+    """
+    if before > timezone.now() - timedelta(days=HISTORY_ARCHIVE_MIN_DAYS):
+        raise ValueError(f"Only History rows older than {HISTORY_ARCHIVE_MIN_DAYS} day(s) can be archived.")
+    os.makedirs(directory, exist_ok=True)
+    run = timezone.now().strftime('%Y%m%dT%H%M%S%f')
+    archived = {}
+    current = None
+    high_water = read_high_water(directory)
+    if delete and high_water is not None:
+        delete_archived(high_water, chunk_size)
+
+    def finish(archive):
+        archive.commit()
+        if delete:
+            delete_archived(archive.last, chunk_size)
+        archived[f"{archive.month:%Y-%m}"] = archive.rows
+
+    try:
+        for row in archived_history(before, chunk_size, after=high_water):
+            month = month_start(row['updated_at'])
+            if current is None or current.month != month:
+                if current is not None:
+                    finish(current)
+                current = ArchiveFile(directory, month, run)
+            current.write(row)
+    except BaseException:
+        if current is not None:
+            current.discard()
+        raise
+    if current is not None:
+        finish(current)
+    return archived
+
+
+def archive_files(directory=HISTORY_ARCHIVE_DIR, start=None, end=None):
+    """Archive files whose month overlaps [start, end), oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    first = month_start(start) if start is not None else None
+    files = []
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith('history-') and name.endswith('.ndjson.gz')):
+            continue
+        month = datetime.strptime(name[len('history-'):len('history-YYYY-MM')], '%Y-%m').replace(tzinfo=dt_timezone.utc)
+        if (first is None or month >= first) and (end is None or month < end):
+            files.append(os.path.join(directory, name))
+    return files
+
+
+def matches(row, filters):
+    """Apply export filters ({column: value} or {column__gte|lte|lt: datetime}) to an archived row."""
+    for lookup, expected in filters.items():
+        column, _, operator = lookup.partition('__')
+        value = row.get(column)
+        if operator:
+            value = parse_datetime(value) if value else None
+            if value is None:
+                return False
+            if operator == 'gte' and not value >= expected:
+                return False
+            if operator == 'lte' and not value <= expected:
+                return False
+            if operator == 'lt' and not value < expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def read_history_archive(filters=None, directory=HISTORY_ARCHIVE_DIR):
+    """
+    Stream archived History rows matching `filters` (as built by exports.parse_export_filters on the archive
+    column names). Only the files for the months in the updated_at range are opened, one line at a time.
+    """
+    filters = filters or {}
+    start = filters.get('updated_at__gte')
+    end = filters.get('updated_at__lt') or filters.get('updated_at__lte')
+    if end is not None and 'updated_at__lte' in filters:
+        end += timedelta(microseconds=1)
+    for path in archive_files(directory, start, end):
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            for line in archive:
+                row = json.loads(line)
+                if matches(row, filters):
+                    yield row
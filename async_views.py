@@ -0,0 +1,121 @@
+"""
+Async (ASGI) counterparts of the read-heavy list endpoints, plus detail endpoints, mounted under async/.
+Bodies, field selection, keyset pages and ETags match the sync views; the database is read through the
+async ORM so an ASGI worker is free to serve other requests during each round trip.
+"""
+import functools
+
+from django.http import HttpResponseNotAllowed, JsonResponse
+
+from .conditional import alist_validators, not_modified_response, set_validators
+from .models import Policy, Template, Acknowledgement, CustomerCompliance
+from .pagination import InvalidPageRequest, page_queryset, split_page
+from .serializers import InvalidFieldSelection, serializer_for
+from .views import project
+
+# Rows fetched per round trip when streaming an unpaginated list out of the async iterator
+ASYNC_ITERATOR_CHUNK_SIZE = 2000
+
+# model -> the queryset its sync list view serializes
+LIST_QUERYSETS = {
+    Policy: lambda: Policy.objects.all(),
+    Template: lambda: Template.objects.filter(is_active=True),
+    Acknowledgement: lambda: Acknowledgement.objects.all(),
+    CustomerCompliance: lambda: CustomerCompliance.objects.all(),
+}
+
+
+def async_get_view(view):
+    """Restrict an async view to GET/HEAD (the sync decorators only wrap async views from Django 5.0)."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponseNotAllowed(['GET', 'HEAD'])
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def async_list_response(request, model, envelope=None):
+    """
+    Async variant of views.list_response. With `envelope` (a message), the body is wrapped the way
+    acknowledgement_view wraps it: {"message", "data"[, "next_cursor"]}.
+    """
+    queryset = LIST_QUERYSETS[model]()
+    try:
+        etag, last_modified = await alist_validators(request, queryset)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        fields = serializer_for(model).parse_fields(request.GET.get('fields'))
+        page = page_queryset(request.GET, project(queryset, fields))
+    except (InvalidFieldSelection, InvalidPageRequest) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    next_cursor = None
+    if page is None:
+        rows = [row async for row in project(queryset, fields).aiterator(chunk_size=ASYNC_ITERATOR_CHUNK_SIZE)]
+    else:
+        page_rows, page_size = page
+        rows, next_cursor = split_page([row async for row in page_rows], page_size)
+    data = serializer_for(model)(rows, many=True, fields=fields).data
+
+    if envelope is not None:
+        body = {"message": envelope, "data": data}
+        if page is not None:
+            body["next_cursor"] = next_cursor
+    elif page is not None:
+        body = {"results": data, "next_cursor": next_cursor}
+    else:
+        body = data
+    return set_validators(JsonResponse(body, safe=False), etag, last_modified)
+
+
+async def async_detail_response(request, model, pk):
+    try:
+        fields = serializer_for(model).parse_fields(request.GET.get('fields'))
+        instance = await project(LIST_QUERYSETS[model](), fields).aget(pk=pk)
+    except InvalidFieldSelection as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except model.DoesNotExist:
+        return JsonResponse({"error": f"{model._meta.verbose_name.capitalize()} not found."}, status=404)
+    return JsonResponse(serializer_for(model)(instance, fields=fields).data)
+
+
+@async_get_view
+async def async_policy_list(request):
+    return await async_list_response(request, Policy)
+
+
+@async_get_view
+async def async_policy_detail(request, pk):
+    return await async_detail_response(request, Policy, pk)
+
+
+@async_get_view
+async def async_template_list(request):
+    return await async_list_response(request, Template)
+
+
+@async_get_view
+async def async_template_detail(request, pk):
+    return await async_detail_response(request, Template, pk)
+
+
+@async_get_view
+async def async_acknowledgement_list(request):
+    return await async_list_response(request, Acknowledgement, envelope="Acknowledgements retrieved successfully")
+
+
+@async_get_view
+async def async_acknowledgement_detail(request, pk):
+    return await async_detail_response(request, Acknowledgement, pk)
+
+
+@async_get_view
+async def async_customer_compliance_list(request):
+    return await async_list_response(request, CustomerCompliance)
+
+
+@async_get_view
+async def async_customer_compliance_detail(request, pk):
+    return await async_detail_response(request, CustomerCompliance, pk)
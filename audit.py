@@ -0,0 +1,98 @@
+"""
+Append-only audit trail for Acknowledgement.
+Changes to Acknowledgement.AUDITED_FIELDS are diffed against the values loaded from the database (no extra
+query), buffered per savepoint and written with one bulk_create when the transaction commits; rows recorded in
+a savepoint that rolls back are dropped with it. Outside a transaction they are written straight away.
+History rows are never updated or deleted by this module.
+"""
+import weakref
+from datetime import date, datetime
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+HISTORY_BATCH_SIZE = 1000
+
+
+def format_value(value):
+    """History stores text; dates are kept in ISO 8601 so they sort and parse back cleanly."""
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def diff(loaded, current):
+    """(field, old, new) for each field of `loaded` whose value in `current` differs."""
+    return [
+        (field, old, current[field])
+        for field, old in loaded.items()
+        if field in current and current[field] != old
+    ]
+
+
+def history_entries(acknowledgement_id, changes, updated_at):
+    from .models import History
+
+    return [
+        History(
+            acknowledgement_id=acknowledgement_id,
+            field=field,
+            old_value=format_value(old),
+            new_value=format_value(new),
+            updated_at=updated_at,
+        )
+        for field, old, new in changes
+    ]
+
+
+def write_history(entries, using=DEFAULT_DB_ALIAS):
+    from .models import History
+
+    if entries:
+        History.objects.using(using).bulk_create(entries, batch_size=HISTORY_BATCH_SIZE)
+
+
+class HistoryBuffer:
+    """
+    History rows recorded in one savepoint (or outside any savepoint) of a transaction. Its flush is queued with
+    transaction.on_commit when the buffer is created, so Django drops it if that savepoint rolls back.
+    """
+
+    def __init__(self, using, sequence):
+        self.using = using
+        self.sequence = sequence
+        self.entries = []
+
+    def flush(self):
+        # The first buffer flushed on commit writes every buffer still queued, in recording order, in one batch
+        buffers = sorted(transaction.get_connection(self.using).history_buffers.values(), key=lambda b: b.sequence)
+        entries = []
+        for buffer in buffers:
+            entries.extend(buffer.entries)
+            buffer.entries = []
+        write_history(entries, self.using)
+
+
+def record_history(entries, using=DEFAULT_DB_ALIAS):
+    """
+    Queue History rows for the current transaction, or write them now when there is none.
+    Rows recorded in a transaction or savepoint that rolls back are discarded with it.
+    """
+    if not entries:
+        return
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        write_history(entries, using)
+        return
+
+    # Buffers are keyed by the savepoints open when they were recorded. The queued commit hook holds the only
+    # strong reference to a buffer, so one whose hook was dropped by a rollback, or already ran, leaves the map.
+    buffers = connection.__dict__.setdefault('history_buffers', weakref.WeakValueDictionary())
+    key = tuple(connection.savepoint_ids)
+    buffer = buffers.get(key)
+    if buffer is None:
+        connection.history_sequence = getattr(connection, 'history_sequence', 0) + 1
+        buffer = buffers[key] = HistoryBuffer(using, connection.history_sequence)
+        transaction.on_commit(buffer.flush, using=using)
+    buffer.entries.extend(entries)
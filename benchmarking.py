@@ -0,0 +1,124 @@
+"""
+Synthetic data and measurement helpers shared by the bench_* management commands.
+Everything here writes through bulk_create so seeding large volumes stays fast.
+"""
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import (
+    Customer, Compliance, Template, Employee, Policy, Acknowledgement, CustomerCompliance, PolicyConfiguration, History,
+)
+
+# The queryset each list view serializes, plus the hot lookups behind the write paths
+VIEW_QUERYSETS = {
+    'get_customers': lambda: Customer.objects.all(),
+    'get_compliance': lambda: Compliance.objects.all(),
+    'manage_templates': lambda: Template.objects.filter(is_active=True),
+    'employee_view': lambda: Employee.objects.live(),
+    'policy_view': lambda: Policy.objects.all(),
+    'manage_policy_configurations': lambda: PolicyConfiguration.objects.all(),
+    'acknowledgement_view': lambda: Acknowledgement.objects.all(),
+    'customer_compliance_view': lambda: CustomerCompliance.objects.all(),
+    'acknowledgement_view (first page)': lambda: Acknowledgement.objects.order_by('created_at', 'id')[:100],
+    'policy_view (first page)': lambda: Policy.objects.order_by('created_at', 'id')[:100],
+    'latest template by name': lambda: Template.objects.filter(name='Template 1', is_latest=True)[:1],
+    'acknowledgements due this week': lambda: Acknowledgement.objects.due_within(7),
+    'overdue acknowledgements': lambda: Acknowledgement.objects.overdue(),
+    'escalation sweep': lambda: Acknowledgement.objects.overdue(days=7).filter(escalation_status='none'),
+}
+
+
+def seed_dataset(customers=10, employees_per_customer=200, policies_per_customer=20, templates=10, history=True):
+    """
+    Seed customers -> compliances -> employees -> policies -> acknowledgements with one pending or
+    acknowledged acknowledgement per employee and policy, plus a status History row for every acknowledged
+    one when `history` is set. Returns the number of acknowledgements created.
+    """
+    now = timezone.now()
+    template_rows = Template.objects.bulk_create([
+        Template(name=f'Template {i}', version_number=1, is_latest=True, description='x' * 2000)
+        for i in range(templates)
+    ])
+    compliance = Compliance.objects.create(compliance_title='Benchmark compliance')
+    customer_rows = Customer.objects.bulk_create([Customer(name=f'Customer {i}') for i in range(customers)])
+
+    acknowledgement_count = 0
+    for customer in customer_rows:
+        customer_compliance = CustomerCompliance.objects.create(customer=customer, compliance=compliance)
+        employees = Employee.objects.bulk_create([
+            Employee(
+                name=f'Employee {customer.id}-{i}', email=f'employee-{customer.id}-{i}@example.com',
+                customer=customer, role='engineer' if i % 3 else 'manager',
+                join_date=now - timedelta(days=i % 400),
+            )
+            for i in range(employees_per_customer)
+        ])
+        policies = Policy.objects.bulk_create([
+            Policy(
+                title=f'Policy {customer.id}-{i}', template=template_rows[i % templates],
+                customer_compliance=customer_compliance, description='x' * 2000,
+            )
+            for i in range(policies_per_customer)
+        ])
+        acknowledgements = [
+            Acknowledgement(
+                policy=policy, employee=employee, acknowledgement_type='periodic',
+                status='acknowledged' if (employee.id + policy.id) % 4 == 0 else 'pending',
+                due_date=employee.join_date + timedelta(days=365),
+            )
+            for policy in policies
+            for employee in employees
+        ]
+        Acknowledgement.objects.bulk_create(acknowledgements, batch_size=5000)
+        acknowledgement_count += len(acknowledgements)
+
+        if history:
+            acknowledged = Acknowledgement.objects.filter(
+                policy__customer_compliance=customer_compliance, status='acknowledged'
+            ).values_list('id', flat=True)
+            History.objects.bulk_create([
+                History(
+                    acknowledgement_id=acknowledgement_id, field='status', old_value='pending',
+                    new_value='acknowledged', updated_at=now,
+                )
+                for acknowledgement_id in acknowledged.iterator()
+            ], batch_size=5000)
+    return acknowledgement_count
+
+
+def time_queryset(make_queryset, repeat=5):
+    """Average wall time in seconds to fully evaluate a fresh queryset from `make_queryset`."""
+    list(make_queryset())  # Warm up caches and the statement cache
+    start = time.perf_counter()
+    for _ in range(repeat):
+        list(make_queryset())
+    return (time.perf_counter() - start) / repeat
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def latency_summary(latencies_ms):
+    """p50/p95/p99 and max of a list of latencies in ms."""
+    latencies = sorted(latencies_ms)
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'max_ms': round(latencies[-1], 3),
+    }
+
+
+def summarize(samples):
+    """latency_summary plus mean queries for a list of (latency_ms, queries) samples."""
+    summary = latency_summary([latency for latency, _ in samples])
+    summary['queries_per_request'] = round(sum(queries for _, queries in samples) / len(samples), 2)
+    return summary
@@ -0,0 +1,356 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# Seconds a compliance dashboard summary may be served from cache; 0 disables caching
+COMPLIANCE_DASHBOARD_CACHE_TIMEOUT = getattr(settings, 'COMPLIANCE_DASHBOARD_CACHE_TIMEOUT', 30)
+
+
+def compliance_dashboard_key(customer_id=None):
+    return f'compliance_dashboard:{int(customer_id) if customer_id else "all"}'
+
+
+def invalidate_compliance_dashboard(customer_ids):
+    """Drop the cached dashboard of each customer in `customer_ids` and the all-customers summary."""
+    keys = [compliance_dashboard_key(customer_id) for customer_id in set(customer_ids)]
+    cache.delete_many(keys + [compliance_dashboard_key()])
+
+
+def shared_generation(key):
+    """Value of the generation counter `key` in the shared cache, creating it if it is missing."""
+    generation = cache.get(key)
+    if generation is None:
+        # Seeded from the clock, so a counter lost to eviction never restarts at a generation already cached
+        cache.add(key, time.time_ns() // 1000, None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns() // 1000, None)
+
+
+# Latest template per name, as (id, version_number). Entries live in the shared cache for
+# LATEST_TEMPLATE_CACHE_TIMEOUT seconds and in a per-process map, both under a shared generation counter that
+# every lookup reads. Template.save() bumps the generation, so every process drops its entries on its next lookup.
+LATEST_TEMPLATE_CACHE_TIMEOUT = getattr(settings, 'LATEST_TEMPLATE_CACHE_TIMEOUT', 3600)
+LATEST_TEMPLATE_GENERATION_KEY = 'latest_template:generation'
+
+_latest_templates = {}
+
+
+def latest_template_key(name, generation):
+    # Template names are free text, so hash them into a key every cache backend accepts
+    return f'latest_template:{generation}:{hashlib.md5(name.encode()).hexdigest()}'
+
+
+def get_latest_template(name, load):
+    """
+    Return (id, version_number) of the latest template called `name`, or None if no version is latest.
+    `load(name)` is only called when neither cache tier has the entry for the current generation.
+    """
+    generation = shared_generation(LATEST_TEMPLATE_GENERATION_KEY)
+    entry = _latest_templates.get(name)
+    if entry and entry[0] == generation:
+        return entry[1]
+
+    key = latest_template_key(name, generation)
+    cached = cache.get(key)
+    if cached is None:
+        latest = load(name)
+        # As with the object cache, a version read inside a transaction may still be rolled back
+        if transaction.get_connection().in_atomic_block:
+            return tuple(latest) if latest else None
+        # An empty tuple records "no latest version" so misses are cached too
+        cached = tuple(latest) if latest else ()
+        cache.set(key, cached, LATEST_TEMPLATE_CACHE_TIMEOUT)
+
+    latest = cached or None
+    _latest_templates[name] = (generation, latest)
+    return latest
+
+
+def invalidate_latest_template(*names):
+    """Move every process on to a new generation; `names` are dropped from this process's map straight away."""
+    for name in names:
+        _latest_templates.pop(name, None)
+    bump_generation(LATEST_TEMPLATE_GENERATION_KEY)
+
+
+# Read-through cache of hot, rarely changing rows (customers, compliances, policies, employees) by primary key.
+# Lookups go to a per-process LRU (entries live OBJECT_CACHE_LOCAL_TTL seconds), then to the Django cache named
+# by OBJECT_CACHE_ALIAS (None keeps the cache per-process), then to the database. Saving or deleting a cached
+# model invalidates both tiers in the saving process; other processes see the change once their local entry expires.
+OBJECT_CACHE_MODELS = getattr(settings, 'OBJECT_CACHE_MODELS', ('customer', 'compliance', 'policy', 'employee'))
+OBJECT_CACHE_ALIAS = getattr(settings, 'OBJECT_CACHE_ALIAS', 'default')
+OBJECT_CACHE_TIMEOUT = getattr(settings, 'OBJECT_CACHE_TIMEOUT', 300)
+OBJECT_CACHE_LOCAL_SIZE = getattr(settings, 'OBJECT_CACHE_LOCAL_SIZE', 2048)
+OBJECT_CACHE_LOCAL_TTL = getattr(settings, 'OBJECT_CACHE_LOCAL_TTL', 5)
+
+
+class LocalLRUCache:
+    """Thread-safe per-process LRU map whose entries expire `ttl` seconds after they are set."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ObjectCache:
+    """
+    Read-through cache of one model's rows by primary key.
+    Rows are cached as tuples of field values and rebuilt with Model.from_db(), so every caller gets its own
+    instance. Callers that update a row should still load it from the database, since a cached copy may be a few
+    seconds old.
+    """
+
+    def __init__(self, model, alias=OBJECT_CACHE_ALIAS, timeout=OBJECT_CACHE_TIMEOUT,
+                 local_size=OBJECT_CACHE_LOCAL_SIZE, local_ttl=OBJECT_CACHE_LOCAL_TTL):
+        self.model = model
+        self.alias = alias
+        self.timeout = timeout
+        self.local = LocalLRUCache(local_size, local_ttl)
+        self.attnames = [field.attname for field in model._meta.concrete_fields]
+        self.counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0}
+        self._counters_lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def key(self, pk):
+        return f'object:{self.model._meta.label_lower}:{pk}'
+
+    def _count(self, counter, amount=1):
+        with self._counters_lock:
+            self.counters[counter] += amount
+
+    def get(self, pk, **conditions):
+        """
+        The instance with primary key `pk`. Raises model.DoesNotExist when there is no such row or it does not
+        match `conditions` (field=value pairs on the model's own fields, e.g. is_deleted=False), and ValueError
+        when `pk` is not a valid primary key.
+        """
+        try:
+            pk = self.model._meta.pk.to_python(pk)
+        except ValidationError as e:
+            raise ValueError(e.messages[0])
+        key = self.key(pk)
+
+        values = self.local.get(key)
+        if values is not None:
+            self._count('local_hits')
+        else:
+            shared = self.shared
+            values = shared.get(key) if shared is not None else None
+            if values is not None:
+                self._count('shared_hits')
+            else:
+                self._count('misses')
+                values = self.model._base_manager.filter(pk=pk).values_list(*self.attnames).first()
+                if values is None:
+                    raise self.model.DoesNotExist(f"{self.model.__name__} matching query does not exist.")
+                # A row read inside a transaction may still be rolled back, so only committed state is cached
+                if transaction.get_connection().in_atomic_block:
+                    return self.build(values, conditions)
+                if shared is not None:
+                    shared.set(key, values, self.timeout)
+            self.local.set(key, values)
+        return self.build(values, conditions)
+
+    def build(self, values, conditions):
+        instance = self.model.from_db(DEFAULT_DB_ALIAS, self.attnames, values)
+        if any(getattr(instance, field) != expected for field, expected in conditions.items()):
+            raise self.model.DoesNotExist(f"{self.model.__name__} matching query does not exist.")
+        return instance
+
+    def invalidate(self, *pks):
+        keys = [self.key(pk) for pk in pks]
+        for key in keys:
+            self.local.delete(key)
+        shared = self.shared
+        if shared is not None:
+            shared.delete_many(keys)
+        self._count('invalidations', len(keys))
+
+    def stats(self):
+        with self._counters_lock:
+            counters = dict(self.counters)
+        lookups = counters['local_hits'] + counters['shared_hits'] + counters['misses']
+        counters['hit_ratio'] = round((lookups - counters['misses']) / lookups, 4) if lookups else None
+        counters['local_entries'] = len(self.local)
+        return counters
+
+
+_object_caches = {}
+_object_caches_lock = threading.Lock()
+
+
+def object_cache(model):
+    """The ObjectCache of `model`, or None when the model is not listed in OBJECT_CACHE_MODELS."""
+    if model._meta.model_name not in OBJECT_CACHE_MODELS:
+        return None
+    store = _object_caches.get(model)
+    if store is None:
+        with _object_caches_lock:
+            store = _object_caches.setdefault(model, ObjectCache(model))
+    return store
+
+
+def invalidate_objects(model, *pks):
+    """Drop cached rows of `model` now and again once the current transaction commits."""
+    store = object_cache(model)
+    if store is None or not pks:
+        return
+    store.invalidate(*pks)
+    transaction.on_commit(lambda: store.invalidate(*pks))
+
+
+def object_cache_stats():
+    """Hit/miss counters of every object cache used in this process."""
+    return {model._meta.label_lower: store.stats() for model, store in list(_object_caches.items())}
+
+
+# Pre-rendered JSON bodies of the catalog list endpoints (active templates, live compliances), which every client
+# fetches and which rarely change. Each catalog has a generation counter in the shared cache that Template and
+# Compliance writes (save, delete, queryset update/delete/hard_delete) bump, and bodies are stored per
+# (generation, request path), so nothing is ever invalidated: a write simply moves readers on to a new generation.
+# A GET costs one shared-cache read of the generation plus a per-process lookup of the bytes.
+# CATALOG_CACHE_TIMEOUT = 0 disables the cache.
+# Bodies rendered inside a transaction are never stored, so with ATOMIC_REQUESTS = True every request misses.
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 3600)
+CATALOG_CACHE_LOCAL_SIZE = getattr(settings, 'CATALOG_CACHE_LOCAL_SIZE', 256)
+CATALOGS = ('templates', 'compliances')
+
+
+class CatalogCache:
+    """Versioned cache of one catalog's rendered responses, as (content, etag, last_modified) entries."""
+
+    def __init__(self, name, timeout=CATALOG_CACHE_TIMEOUT, local_size=CATALOG_CACHE_LOCAL_SIZE):
+        self.name = name
+        self.timeout = timeout
+        self.local = LocalLRUCache(local_size, timeout)
+        self.counters = {
+            'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'bumps': 0,
+            'regenerations': 0, 'regeneration_ms': 0.0, 'last_regeneration_ms': None,
+        }
+        self._counters_lock = threading.Lock()
+
+    def _count(self, counter, amount=1):
+        with self._counters_lock:
+            self.counters[counter] += amount
+
+    @property
+    def generation_key(self):
+        return f'catalog:{self.name}:generation'
+
+    def generation(self):
+        return shared_generation(self.generation_key)
+
+    def bump(self):
+        bump_generation(self.generation_key)
+        self._count('bumps')
+
+    def get(self, variant, render):
+        """
+        The entry for `variant` (the request path) in the current generation. `render()` builds it on a miss;
+        exceptions it raises propagate and nothing is stored.
+        """
+        key = f'catalog:{self.name}:{self.generation()}:{hashlib.md5(variant.encode()).hexdigest()}'
+        entry = self.local.get(key)
+        if entry is not None:
+            self._count('local_hits')
+            return entry
+        entry = cache.get(key)
+        if entry is not None:
+            self._count('shared_hits')
+        else:
+            self._count('misses')
+            start = time.perf_counter()
+            entry = render()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._counters_lock:
+                self.counters['regenerations'] += 1
+                self.counters['regeneration_ms'] += elapsed_ms
+                self.counters['last_regeneration_ms'] = round(elapsed_ms, 3)
+            # As with the object cache, a body read inside a transaction may include rows that are rolled back
+            if transaction.get_connection().in_atomic_block:
+                return entry
+            cache.set(key, entry, self.timeout)
+        self.local.set(key, entry)
+        return entry
+
+    def stats(self):
+        with self._counters_lock:
+            counters = dict(self.counters)
+        lookups = counters['local_hits'] + counters['shared_hits'] + counters['misses']
+        counters['hit_ratio'] = round((lookups - counters['misses']) / lookups, 4) if lookups else None
+        regenerations = counters['regenerations']
+        counters['mean_regeneration_ms'] = (
+            round(counters['regeneration_ms'] / regenerations, 3) if regenerations else None
+        )
+        counters['regeneration_ms'] = round(counters['regeneration_ms'], 3)
+        counters['local_entries'] = len(self.local)
+        return counters
+
+
+_catalog_caches = {name: CatalogCache(name) for name in CATALOGS}
+
+
+def catalog_cache(name):
+    """The CatalogCache called `name`, or None when catalog caching is disabled."""
+    return _catalog_caches[name] if CATALOG_CACHE_TIMEOUT else None
+
+
+def bump_catalog(name):
+    """Move readers of the catalog `name` to a new generation now and again once the current transaction commits."""
+    store = catalog_cache(name)
+    if store is None:
+        return
+    store.bump()
+    transaction.on_commit(store.bump)
+
+
+def catalog_cache_stats():
+    """Hit ratio and regeneration time of each catalog response cache in this process."""
+    return {name: store.stats() for name, store in _catalog_caches.items()}
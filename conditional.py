@@ -0,0 +1,59 @@
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .pagination import page_queryset
+
+
+# The id sum changes when a row leaves a page and the next one moves up, which leaves the count unchanged
+VALIDATOR_AGGREGATES = {'last_modified': Max('updated_at'), 'count': Count('pk'), 'ids': Sum('pk')}
+
+
+def validated_rows(request, queryset):
+    """
+    The rows a list response's validators cover: the requested keyset page, look-ahead row included, when the
+    client paginates (a bounded range read, as for the page itself), else the whole queryset.
+    Raises InvalidPageRequest for bad pagination parameters.
+    """
+    page = page_queryset(request.GET, queryset)
+    return page[0] if page is not None else queryset.order_by()
+
+
+def list_validators(request, queryset):
+    """
+    ETag and Last-Modified timestamp for a list response, from one aggregate over the rows it covers.
+    The row count and id sum are part of the ETag so removals change it too, and so is the query string,
+    since pagination and field selection change the body. Last-Modified is the newest updated_at only, which a
+    removal does not move: clients that revalidate with If-Modified-Since alone keep getting 304 after a row is
+    deleted, while If-None-Match (checked first when both are sent) sees the change.
+    """
+    return validators_from_stats(request, validated_rows(request, queryset).aggregate(**VALIDATOR_AGGREGATES))
+
+
+async def alist_validators(request, queryset):
+    """Async variant of `list_validators`."""
+    return validators_from_stats(request, await validated_rows(request, queryset).aaggregate(**VALIDATOR_AGGREGATES))
+
+
+def validators_from_stats(request, stats):
+    last_modified = stats['last_modified']
+    raw = f"{request.get_full_path()}|{stats['count']}|{stats['ids']}|{last_modified.isoformat() if last_modified else ''}"
+    etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+    return etag, int(last_modified.timestamp()) if last_modified else None
+
+
+def not_modified_response(request, etag, last_modified):
+    """A 304 response when the client's If-None-Match/If-Modified-Since still match, else None."""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
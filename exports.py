@@ -0,0 +1,144 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_OUTPUTS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Flat column sets streamed with values(); related ids are exported instead of nested objects.
+# Each entry maps the exported column name to the lookup it is read from.
+ACKNOWLEDGEMENT_EXPORT_COLUMNS = {
+    'id': 'id',
+    'customer_id': 'employee__customer_id',
+    'policy_id': 'policy_id',
+    'employee_id': 'employee_id',
+    'policy_version': 'policy_version',
+    'acknowledgement_type': 'acknowledgement_type',
+    'status': 'status',
+    'escalation_status': 'escalation_status',
+    'acknowledged_at': 'acknowledged_at',
+    'due_date': 'due_date',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+HISTORY_EXPORT_COLUMNS = {
+    'id': 'id',
+    'acknowledgement_id': 'acknowledgement_id',
+    'customer_id': 'acknowledgement__employee__customer_id',
+    'policy_id': 'acknowledgement__policy_id',
+    'field': 'field',
+    'old_value': 'old_value',
+    'new_value': 'new_value',
+    'updated_at': 'updated_at',
+}
+
+
+class InvalidExportRequest(ValueError):
+    """Raised when export query parameters cannot be applied."""
+
+
+class Echo:
+    """File-like object whose write() returns the value, so csv.writer output can be yielded directly."""
+    def write(self, value):
+        return value
+
+
+def parse_days(params, param):
+    """A whole number of days from the query parameter `param`, or None when it is absent."""
+    value = params.get(param)
+    if value in (None, ''):
+        return None
+    if not value.isdigit():
+        raise InvalidExportRequest(f"'{param}' must be a number of days.")
+    return int(value)
+
+
+def parse_export_filters(params, customer_field, policy_field, date_field):
+    """Translate the `customer`, `policy`, `from` and `to` query parameters into queryset filters."""
+    filters = {}
+    for param, field in (('customer', customer_field), ('policy', policy_field)):
+        value = params.get(param)
+        if not value:
+            continue
+        if not value.isdigit():
+            raise InvalidExportRequest(f"'{param}' must be an id.")
+        filters[field] = int(value)
+    for param in ('from', 'to'):
+        value = params.get(param)
+        if not value:
+            continue
+        lookup = 'gte' if param == 'from' else 'lte'
+        try:
+            day = parse_date(value)
+            moment = None if day is not None else parse_datetime(value)
+        except ValueError:
+            day = moment = None
+        if day is not None:
+            # A bare `to` date includes that whole day
+            if param == 'to':
+                day += timedelta(days=1)
+                lookup = 'lt'
+            moment = datetime.combine(day, time.min)
+        elif moment is None:
+            raise InvalidExportRequest(f"'{param}' must be an ISO 8601 date or datetime.")
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        filters[f'{date_field}__{lookup}'] = moment
+    return filters
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def csv_lines(rows, columns):
+    writer = csv.writer(Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([row[column] for column in columns])
+
+
+def export_values(queryset, columns):
+    """`queryset` as dicts keyed by the export column names."""
+    plain = [column for column, lookup in columns.items() if column == lookup]
+    aliased = {column: F(lookup) for column, lookup in columns.items() if column != lookup}
+    return queryset.values(*plain, **aliased)
+
+
+def export_rows(queryset, columns):
+    """Iterate `queryset` as dicts keyed by the export column names, EXPORT_CHUNK_SIZE rows at a time."""
+    return export_values(queryset.order_by('id'), columns).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def streaming_export(queryset, columns, output, filename):
+    """
+    Stream `queryset` as NDJSON or CSV.
+    Rows are read as dicts in chunks of EXPORT_CHUNK_SIZE, so memory stays flat however many rows match.
+    """
+    return streaming_rows(export_rows(queryset, columns), columns, output, filename)
+
+
+def streaming_rows(rows, columns, output, filename):
+    """Stream an iterable of export rows (dicts keyed by the names in `columns`) as NDJSON or CSV."""
+    if output not in EXPORT_OUTPUTS:
+        raise InvalidExportRequest(f"'output' must be one of: {', '.join(EXPORT_OUTPUTS)}.")
+
+    if output == 'csv':
+        lines = csv_lines(rows, list(columns))
+    else:
+        lines = ndjson_lines(rows)
+
+    response = StreamingHttpResponse(lines, content_type=EXPORT_OUTPUTS[output])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{output}"'
+    return response
@@ -0,0 +1,178 @@
+"""
+Per-request latency and SQL instrumentation.
+Enable by adding 'policy.instrumentation.QueryInstrumentationMiddleware' to MIDDLEWARE.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('policy.slow_requests')
+
+SLOW_REQUEST_THRESHOLD_MS = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500)
+# Statements kept per request for the slow-request log
+MAX_LOGGED_QUERIES = 200
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class QueryRecorder:
+    """Database execute wrapper that counts and times every statement of a request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if len(self.statements) < MAX_LOGGED_QUERIES:
+                self.statements.append((elapsed, sql))
+
+
+def record(view, wall_ms, db_ms, queries):
+    with _stats_lock:
+        entry = _stats.get(view)
+        if entry is None:
+            entry = _stats[view] = {
+                'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0, 'queries': 0, 'max_queries': 0,
+                'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+        entry['requests'] += 1
+        entry['total_ms'] += wall_ms
+        entry['max_ms'] = max(entry['max_ms'], wall_ms)
+        entry['db_ms'] += db_ms
+        entry['queries'] += queries
+        entry['max_queries'] = max(entry['max_queries'], queries)
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if wall_ms <= bound), len(LATENCY_BUCKETS_MS))
+        entry['buckets'][bucket] += 1
+
+
+def request_stats():
+    """Snapshot of the per-view histograms recorded in this process."""
+    labels = [f'<={bound}ms' for bound in LATENCY_BUCKETS_MS] + [f'>{LATENCY_BUCKETS_MS[-1]}ms']
+    with _stats_lock:
+        return {
+            view: {
+                'requests': entry['requests'],
+                'avg_ms': round(entry['total_ms'] / entry['requests'], 3),
+                'max_ms': round(entry['max_ms'], 3),
+                'avg_db_ms': round(entry['db_ms'] / entry['requests'], 3),
+                'avg_queries': round(entry['queries'] / entry['requests'], 2),
+                'max_queries': entry['max_queries'],
+                'latency_histogram': dict(zip(labels, entry['buckets'])),
+            }
+            for view, entry in _stats.items()
+        }
+
+
+def reset_request_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def recording(recorder):
+    """Context manager that routes every connection's statements through `recorder` while it is open."""
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+    return stack
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Time each request and its SQL, expose both in a Server-Timing header, add them to the in-process histogram
+    served by the stats endpoint, and log the statements of requests slower than SLOW_REQUEST_THRESHOLD_MS.
+    Runs natively under both WSGI and ASGI. A streaming response is measured until its last chunk is sent, so it
+    carries no Server-Timing header (the headers go out before the body is produced).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with recording(recorder):
+            response = self.get_response(request)
+        return self.process(request, response, recorder, start)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        # Async views reach the database through sync_to_async, on the request's thread-sensitive thread, so the
+        # wrappers are installed on that thread's connections
+        stack = await sync_to_async(recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.process(request, response, recorder, start)
+
+    def process(self, request, response, recorder, start):
+        if not response.streaming:
+            wall_ms, db_ms = self.finish(request, recorder, start)
+            response['Server-Timing'] = (
+                f'total;dur={wall_ms:.1f}, db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+                f'app;dur={max(wall_ms - db_ms, 0):.1f}'
+            )
+        elif response.is_async:
+            response.streaming_content = self.astream(request, response.streaming_content, recorder, start)
+        else:
+            response.streaming_content = self.stream(request, response.streaming_content, recorder, start)
+        return response
+
+    def stream(self, request, content, recorder, start):
+        # The recorder stays active while the body is produced, and the request is recorded once it is done
+        try:
+            with recording(recorder):
+                yield from content
+        finally:
+            self.finish(request, recorder, start)
+
+    async def astream(self, request, content, recorder, start):
+        stack = await sync_to_async(recording)(recorder)
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            await sync_to_async(stack.close)()
+            self.finish(request, recorder, start)
+
+    def finish(self, request, recorder, start):
+        """Record and (when slow) log the request; returns (wall_ms, db_ms)."""
+        wall_ms = (time.perf_counter() - start) * 1000
+        db_ms = recorder.duration * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view = f"{request.method} {match.route if match else 'unresolved'}"
+        record(view, wall_ms, db_ms, recorder.count)
+
+        if wall_ms >= SLOW_REQUEST_THRESHOLD_MS:
+            logger.warning(
+                "Slow request %s (%s): %.1f ms, %d queries, %.1f ms in DB\n%s",
+                request.get_full_path(), view, wall_ms, recorder.count, db_ms,
+                "\n".join(f"  [{elapsed * 1000:.1f} ms] {sql}" for elapsed, sql in recorder.statements),
+            )
+        return wall_ms, db_ms
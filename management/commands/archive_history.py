@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from policy.archive import (
+    HISTORY_ARCHIVE_CHUNK_SIZE, HISTORY_ARCHIVE_DIR, HISTORY_ARCHIVE_MIN_DAYS, HISTORY_RETENTION_DAYS, archive_history,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Move History rows older than the retention window into gzip NDJSON files, one per month of updated_at. "
+        "Archived rows stay readable through GET exports/history/archive/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=HISTORY_RETENTION_DAYS, help="Retention window in days.")
+        parser.add_argument('--directory', default=HISTORY_ARCHIVE_DIR, help="Where the archive files are written.")
+        parser.add_argument('--chunk-size', type=int, default=HISTORY_ARCHIVE_CHUNK_SIZE)
+        parser.add_argument('--keep', action='store_true', help="Write the archive files but leave the rows in place.")
+
+    def handle(self, *args, **options):
+        if options['days'] < HISTORY_ARCHIVE_MIN_DAYS or options['chunk_size'] < 1:
+            raise CommandError(
+                f"--days must be at least {HISTORY_ARCHIVE_MIN_DAYS} (HISTORY_ARCHIVE_MIN_DAYS) "
+                "and --chunk-size must be positive."
+            )
+        before = timezone.now() - timedelta(days=options['days'])
+        archived = archive_history(
+            before, directory=options['directory'], chunk_size=options['chunk_size'], delete=not options['keep']
+        )
+        for month, rows in archived.items():
+            self.stdout.write(f"{month}: {rows} row(s)")
+        action = "Archived" if options['keep'] else "Archived and deleted"
+        self.stdout.write(f"{action} {sum(archived.values())} History row(s) older than {before:%Y-%m-%d %H:%M}.")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from policy.models import Acknowledgement
+
+
+class Command(BaseCommand):
+    help = "Fill in due_date on acknowledgements that were created without one."
+
+    def handle(self, *args, **options):
+        updated = Acknowledgement.backfill_due_dates()
+        self.stdout.write(f"Set the due date of {updated} acknowledgement(s).")
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import platform
+import threading
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from policy.benchmarking import latency_summary, seed_dataset
+
+# (label, sync URL name, async URL name); list pages are requested with ?page_size=
+ENDPOINTS = [
+    ('policies', 'policy-list-create', 'async_policy_list'),
+    ('templates', 'manage_templates', 'async_template_list'),
+    ('acknowledgements', 'acknowledgement_list_create', 'async_acknowledgement_list'),
+    ('customer-compliance', 'customer_compliance_view', 'async_customer_compliance_list'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent-request throughput of the sync list views (WSGI handler, one thread per worker) "
+        "against their async/ counterparts (ASGI handler, one task per worker) at equal worker counts. "
+        "Runs against a throwaway test database, like the test runner."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=5)
+        parser.add_argument('--employees', type=int, default=100, help="Employees per customer.")
+        parser.add_argument('--policies', type=int, default=10, help="Policies per customer.")
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent threads (sync) or tasks (async).")
+        parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint and mode.")
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--label', default='current', help="Tag stored with the results, e.g. a version.")
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file.")
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['requests'] < 1:
+            raise CommandError("--workers and --requests must be positive.")
+
+        # Worker threads use their own connections, so the dataset has to be committed; it goes into a
+        # test database that is dropped afterwards rather than into the configured one
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            acknowledgements = seed_dataset(
+                customers=options['customers'],
+                employees_per_customer=options['employees'],
+                policies_per_customer=options['policies'],
+            )
+            self.stdout.write(f"Seeded {acknowledgements} acknowledgements.")
+            results = self.run_endpoints(options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = {
+            'label': options['label'],
+            'timestamp': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'dataset': {
+                'customers': options['customers'],
+                'employees_per_customer': options['employees'],
+                'policies_per_customer': options['policies'],
+                'acknowledgements': acknowledgements,
+            },
+            'workers': options['workers'],
+            'requests_per_run': options['requests'],
+            'endpoints': results,
+        }
+        for name, modes in results.items():
+            for mode, summary in modes.items():
+                self.stdout.write(
+                    f"{name} [{mode}]: {summary['throughput_rps']} req/s p50={summary['p50_ms']}ms "
+                    f"p95={summary['p95_ms']}ms p99={summary['p99_ms']}ms errors={summary['errors']}"
+                )
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output_file:
+                json.dump(output, output_file, indent=2)
+
+    def run_endpoints(self, options):
+        query = f"?page_size={options['page_size']}"
+        results = {}
+        for name, sync_name, async_name in ENDPOINTS:
+            results[name] = {
+                'sync': self.run_sync(reverse(sync_name) + query, options['workers'], options['requests']),
+                'async': asyncio.run(self.run_async(reverse(async_name) + query, options['workers'], options['requests'])),
+            }
+        return results
+
+    def run_sync(self, path, workers, requests):
+        latencies, errors = [], []
+        remaining = iter(range(requests))
+        lock = threading.Lock()
+
+        def worker():
+            client = Client()
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    start = time.perf_counter()
+                    response = client.get(path)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    with lock:
+                        latencies.append(elapsed)
+                        if response.status_code != 200:
+                            errors.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.summarize(latencies, errors, time.perf_counter() - start)
+
+    async def run_async(self, path, workers, requests):
+        latencies, errors = [], []
+        remaining = iter(range(requests))
+
+        async def worker():
+            client = AsyncClient()
+            while next(remaining, None) is not None:
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append((time.perf_counter() - start) * 1000)
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return self.summarize(latencies, errors, time.perf_counter() - start)
+
+    def summarize(self, latencies, errors, wall):
+        summary = latency_summary(latencies)
+        summary['wall_seconds'] = round(wall, 3)
+        summary['throughput_rps'] = round(len(latencies) / wall, 1)
+        summary['errors'] = len(errors)
+        return summary
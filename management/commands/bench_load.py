@@ -0,0 +1,202 @@
+import json
+import platform
+import random
+import time
+from collections import defaultdict
+from itertools import count
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from policy.benchmarking import seed_dataset, summarize
+from policy.instrumentation import QueryRecorder
+from policy.models import Acknowledgement, CustomerCompliance, Template
+
+# Relative weight of each operation in the mixed workload
+READ_WEIGHTS = {
+    'GET customers': 5,
+    'GET compliances': 3,
+    'GET templates': 5,
+    'GET employees (page)': 10,
+    'GET policies': 10,
+    'GET acknowledgements (page)': 20,
+    'GET customer-compliance': 5,
+    'GET compliance-dashboard': 5,
+}
+WRITE_WEIGHTS = {
+    'POST acknowledgements (acknowledge)': 20,
+    'POST customers': 2,
+    'POST policies (default)': 5,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset, replay a mixed read/write workload against the API through Django's test "
+        "client and report p50/p95/p99 latency and queries per request for each endpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=5)
+        parser.add_argument('--employees', type=int, default=200, help="Employees per customer.")
+        parser.add_argument('--policies', type=int, default=10, help="Policies per customer.")
+        parser.add_argument('--no-history', action='store_true', help="Do not seed History rows.")
+        parser.add_argument('--requests', type=int, default=1000, help="Requests in the synthetic workload.")
+        parser.add_argument('--write-ratio', type=float, default=0.2, help="Share of requests that write (0-1).")
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, so runs replay the same workload.")
+        parser.add_argument(
+            '--replay', help='JSON lines file of {"method", "path", "data"} requests to replay after the workload.'
+        )
+        parser.add_argument('--label', default='current', help="Tag stored with the results, e.g. a version.")
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file.")
+
+    def handle(self, *args, **options):
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError("--write-ratio must be between 0 and 1.")
+        replay = self.load_replay(options['replay']) if options['replay'] else []
+
+        # The test environment allows the 'testserver' host and swaps in the locmem email backend
+        setup_test_environment()
+        try:
+            # Everything the run writes is rolled back, so it can run against a shared database.
+            # on_commit hooks (cache invalidation) never fire inside the rolled-back transaction.
+            with transaction.atomic():
+                acknowledgements = seed_dataset(
+                    customers=options['customers'],
+                    employees_per_customer=options['employees'],
+                    policies_per_customer=options['policies'],
+                    history=not options['no_history'],
+                )
+                self.stdout.write(f"Seeded {acknowledgements} acknowledgements.")
+                samples = self.run_workload(options, replay)
+                transaction.set_rollback(True)
+        finally:
+            teardown_test_environment()
+
+        results = {
+            'label': options['label'],
+            'timestamp': timezone.now().isoformat(),
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'dataset': {
+                'customers': options['customers'],
+                'employees_per_customer': options['employees'],
+                'policies_per_customer': options['policies'],
+                'acknowledgements': acknowledgements,
+                'history': not options['no_history'],
+            },
+            'workload': {
+                'requests': options['requests'],
+                'write_ratio': options['write_ratio'],
+                'seed': options['seed'],
+                'replayed': len(replay),
+            },
+            'endpoints': {name: summarize(endpoint_samples) for name, endpoint_samples in sorted(samples.items())},
+            'errors': {name: dict(codes) for name, codes in sorted(self.errors.items())},
+        }
+
+        for name, summary in results['endpoints'].items():
+            self.stdout.write(
+                f"{name}: n={summary['requests']} p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms "
+                f"p99={summary['p99_ms']}ms queries/request={summary['queries_per_request']}"
+            )
+        for name, codes in results['errors'].items():
+            self.stderr.write(f"{name}: unexpected responses {codes}")
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump(results, output, indent=2)
+
+    def load_replay(self, path):
+        requests = []
+        with open(path) as source:
+            for number, line in enumerate(source, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    requests.append((entry.get('method', 'GET').upper(), entry['path'], entry.get('data')))
+                except (ValueError, KeyError, AttributeError):
+                    raise CommandError(f"{path}:{number}: expected an object with at least a 'path'.")
+        return requests
+
+    def run_workload(self, options, replay):
+        rng = random.Random(options['seed'])
+        client = Client()
+        # Every URL in urls.py hangs off the same prefix, wherever the project includes it
+        prefix = reverse('employee_view')[:-len('employees/')]
+        page = f"?page_size={options['page_size']}"
+
+        customer_compliances = list(CustomerCompliance.objects.values_list('id', 'customer_id'))
+        templates = list(Template.objects.filter(is_latest=True).values_list('id', flat=True))
+        # Drawn from the seeded RNG rather than ORDER BY RANDOM() so --seed replays the same rows
+        pending = list(Acknowledgement.objects.filter(status='pending').order_by('id').values_list('id', flat=True))
+        rng.shuffle(pending)
+        del pending[options['requests']:]
+        names = count(1)
+
+        def operation(name):
+            if name == 'GET customers':
+                return 'GET', 'customers/', None
+            if name == 'GET compliances':
+                return 'GET', 'compliances/', None
+            if name == 'GET templates':
+                return 'GET', 'templates/', None
+            if name == 'GET employees (page)':
+                return 'GET', 'employees/' + page, None
+            if name == 'GET policies':
+                return 'GET', 'policies/' + page, None
+            if name == 'GET acknowledgements (page)':
+                return 'GET', 'acknowledgements/' + page, None
+            if name == 'GET customer-compliance':
+                return 'GET', 'customer-compliance/', None
+            if name == 'GET compliance-dashboard':
+                return 'GET', f'compliance-dashboard/?customer={rng.choice(customer_compliances)[1]}', None
+            if name == 'POST acknowledgements (acknowledge)':
+                if not pending:
+                    return None
+                return 'POST', 'acknowledgements/', {'id': pending.pop(), 'status': 'acknowledged'}
+            if name == 'POST customers':
+                return 'POST', 'customers/', {'name': f'Load test customer {next(names)}'}
+            if name == 'POST policies (default)':
+                return 'POST', 'policies/', {
+                    'type': 'default', 'title': f'Load test policy {next(names)}',
+                    'template': rng.choice(templates), 'customer_compliance': rng.choice(customer_compliances)[0],
+                }
+
+        reads, writes = list(READ_WEIGHTS), list(WRITE_WEIGHTS)
+        workload = []
+        for _ in range(options['requests']):
+            if rng.random() < options['write_ratio']:
+                name = rng.choices(writes, weights=[WRITE_WEIGHTS[w] for w in writes])[0]
+            else:
+                name = rng.choices(reads, weights=[READ_WEIGHTS[r] for r in reads])[0]
+            request = operation(name)
+            if request is not None:
+                workload.append((name, *request))
+        workload.extend((f"REPLAY {method} {path.split('?')[0]}", method, path, data) for method, path, data in replay)
+
+        samples = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        for name, method, path, data in workload:
+            if not path.startswith('/'):
+                path = prefix + path
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                start = time.perf_counter()
+                if method == 'GET':
+                    response = client.get(path)
+                else:
+                    response = client.generic(method, path, json.dumps(data or {}), content_type='application/json')
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            samples[name].append((elapsed_ms, recorder.count))
+            if response.status_code >= 400:
+                self.errors[name][response.status_code] += 1
+        return samples
@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from policy.benchmarking import VIEW_QUERYSETS, seed_dataset, time_queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic dataset and report the query plan and latency of each view's queryset. "
+        "Run it before and after migrating the index set and compare the output."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=10)
+        parser.add_argument('--employees', type=int, default=200, help="Employees per customer.")
+        parser.add_argument('--policies', type=int, default=20, help="Policies per customer.")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed evaluations per queryset.")
+        parser.add_argument('--label', default='current', help="Tag stored with each result, e.g. before/after.")
+        parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file.")
+        parser.add_argument('--no-plans', action='store_true', help="Skip EXPLAIN output.")
+
+    def handle(self, *args, **options):
+        results = []
+        # The seeded rows are rolled back so the benchmark can run against a shared database
+        with transaction.atomic():
+            acknowledgements = seed_dataset(
+                customers=options['customers'],
+                employees_per_customer=options['employees'],
+                policies_per_customer=options['policies'],
+            )
+            self.stdout.write(f"Seeded {acknowledgements} acknowledgements.")
+
+            for name, make_queryset in VIEW_QUERYSETS.items():
+                latency = time_queryset(make_queryset, repeat=options['repeat'])
+                plan = None if options['no_plans'] else make_queryset().explain()
+                results.append({'label': options['label'], 'view': name, 'latency_ms': round(latency * 1000, 3), 'plan': plan})
+
+                self.stdout.write(f"{name}: {latency * 1000:.3f} ms")
+                if plan:
+                    for line in plan.splitlines():
+                        self.stdout.write(f"    {line}")
+            transaction.set_rollback(True)
+
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump(results, output, indent=2)
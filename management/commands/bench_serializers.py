@@ -0,0 +1,79 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from policy.models import Customer, Employee, Template, Policy, Acknowledgement
+from policy.serializers import serializer_for
+
+
+class LegacyCommonSerializer(serializers.ModelSerializer):
+    """The pre-registry CommonSerializer, kept here only as the benchmark baseline."""
+    def __init__(self, *args, **kwargs):
+        model = kwargs.pop('model', None)
+        if model:
+            self.Meta.model = model
+        super().__init__(*args, **kwargs)
+
+    class Meta:
+        model = None
+        fields = '__all__'
+
+
+class Command(BaseCommand):
+    help = "Compare per-request serialization time of the legacy CommonSerializer and serializer_for()."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50, help="Rows per table to seed.")
+        parser.add_argument('--iterations', type=int, default=200, help="Simulated requests per case.")
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        iterations = options['iterations']
+
+        # Seed inside a transaction that is always rolled back so the benchmark leaves no data behind
+        with transaction.atomic():
+            self.seed(rows)
+            cases = [
+                ('policy_view', Policy, lambda: Policy.objects.all()),
+                ('acknowledgement_view', Acknowledgement, lambda: Acknowledgement.objects.all()),
+            ]
+            for name, model, queryset in cases:
+                # Materialize once so only serialization is measured
+                instances = list(queryset())
+                before = self.measure(iterations, lambda: LegacyCommonSerializer(instances, many=True, model=model).data)
+                after = self.measure(iterations, lambda: serializer_for(model)(instances, many=True).data)
+                self.stdout.write(
+                    f"{name}: before {before * 1000:.3f} ms/request, after {after * 1000:.3f} ms/request "
+                    f"({before / after:.2f}x)"
+                )
+            transaction.set_rollback(True)
+
+    def measure(self, iterations, serialize):
+        serialize()  # Warm up
+        start = time.perf_counter()
+        for _ in range(iterations):
+            serialize()
+        return (time.perf_counter() - start) / iterations
+
+    def seed(self, rows):
+        now = timezone.now()
+        customer = Customer.objects.create(name='Benchmark Customer')
+        template = Template.objects.create(name='Benchmark Template', is_latest=True)
+        employees = Employee.objects.bulk_create([
+            Employee(name=f'Employee {i}', email=f'bench-{i}@example.com', customer=customer,
+                     role='engineer', join_date=now - timedelta(days=10))
+            for i in range(rows)
+        ])
+        policies = Policy.objects.bulk_create([
+            Policy(title=f'Policy {i}', template=template, description='x' * 500)
+            for i in range(rows)
+        ])
+        Acknowledgement.objects.bulk_create([
+            Acknowledgement(policy=policies[i], employee=employees[i], acknowledgement_type='manual',
+                            due_date=now + timedelta(days=30))
+            for i in range(rows)
+        ])
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from policy.models import Customer, Compliance, Employee
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply the soft delete cascade to rows deleted before it existed: flag the employees of deleted customers "
+        "and soft delete the customer compliances and policies of deleted customers and compliances."
+    )
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        with transaction.atomic():
+            customer_ids = list(Customer.all_objects.deleted().values_list('id', flat=True))
+            compliance_ids = list(Compliance.all_objects.deleted().values_list('id', flat=True))
+            employees = Employee.set_customer_deleted(customer_ids, True)
+            Customer.soft_delete_dependents(customer_ids, now)
+            Compliance.soft_delete_dependents(compliance_ids, now)
+        self.stdout.write(
+            f"Cascaded {len(customer_ids)} deleted customer(s) and {len(compliance_ids)} deleted compliance(s); "
+            f"flagged {employees} employee(s)."
+        )
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from policy.notifications import dispatch_notifications
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification emails from the outbox, batching them per recipient."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep dispatching instead of exiting after one pass.")
+        parser.add_argument('--interval', type=int, default=30, help="Seconds between passes with --loop.")
+        parser.add_argument('--batch-size', type=int, default=500, help="Outbox rows claimed per pass.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = dispatch_notifications(batch_size=options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} notification(s), {failed} failed.")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from policy.models import Acknowledgement
+
+
+class Command(BaseCommand):
+    help = "Escalate overdue pending acknowledgements to HR and then CXO/CTO, queueing the escalation emails."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep sweeping instead of exiting after one pass.")
+        parser.add_argument('--interval', type=int, default=300, help="Seconds between sweeps with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            self.sweep()
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def sweep(self):
+        # Escalation emails are queued in the outbox and delivered by dispatch_notifications
+        escalated = Acknowledgement.escalate_overdue()
+        for role, ids in escalated.items():
+            self.stdout.write(f"Escalated {len(ids)} acknowledgement(s) to {role}.")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from policy.models import PolicyConfiguration, PolicyConfigurationSnapshot
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-version effective configuration snapshots of policies from PolicyConfiguration."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--policy', type=int, action='append', help="Only rebuild this policy id (repeatable).")
+
+    def handle(self, *args, **options):
+        policy_ids = options['policy'] or (
+            PolicyConfiguration.objects.order_by('policy_id').values_list('policy_id', flat=True).distinct()
+        )
+        written = 0
+        for policy_id in policy_ids:
+            written += PolicyConfigurationSnapshot.rebuild(policy_id)
+        self.stdout.write(f"Wrote {written} configuration snapshot(s).")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from policy.models import Customer, CustomerCompliance
+
+
+class Command(BaseCommand):
+    help = "Recompute CustomerCompliance acknowledged/pending counters and percentages from Acknowledgement."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer', type=int, action='append', help="Only reconcile this customer id (repeatable).")
+
+    def handle(self, *args, **options):
+        customer_ids = options['customer'] or Customer.objects.order_by('id').values_list('id', flat=True)
+        repaired = 0
+        for customer_id in customer_ids:
+            repaired += CustomerCompliance.reconcile(customer_id)
+        self.stdout.write(f"Repaired {repaired} customer compliance row(s).")
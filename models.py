@@ -1,10 +1,107 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Case, Count, ExpressionWrapper, F, Min, Q, Value, When
+from django.db.models.functions import Greatest
 from datetime import timedelta
+from decimal import Decimal
+from collections import Counter
+from itertools import islice
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from django.core.mail import send_mail
 
-class Customer(models.Model):
+from .audit import diff, history_entries, record_history
+from .caching import invalidate_compliance_dashboard, get_latest_template, invalidate_latest_template, invalidate_objects
+from .caching import bump_catalog, object_cache
+
+
+class ObjectCacheMixin:
+    """Invalidate the row's read-through object cache entry whenever it is saved or deleted."""
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_objects(type(self), self.pk)
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_objects(type(self), pk)
+        return result
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    Querysets of models with an is_deleted flag. delete() soft deletes, so a queryset can no longer
+    hard-delete rows by accident; hard_delete() still removes them.
+    """
+
+    def live(self):
+        return self.filter(is_deleted=False)
+
+    def deleted(self):
+        return self.filter(is_deleted=True)
+
+    def delete(self):
+        return self.soft_delete()
+
+    delete.queryset_only = True
+
+    def hard_delete(self):
+        return super().delete()
+
+    hard_delete.queryset_only = True
+
+    def soft_delete(self, now=None):
+        """
+        Flag the live rows of this queryset as deleted with one update(), then cascade to their dependents
+        (model.soft_delete_dependents), each level another update(). Returns the number of rows deleted here.
+        """
+        now = now or timezone.now()
+        with transaction.atomic(using=self.db):
+            ids = list(self.live().values_list('id', flat=True))
+            if not ids:
+                return 0
+            self.model.all_objects.filter(id__in=ids).update(is_deleted=True, deleted_at=now, updated_at=now)
+            invalidate_objects(self.model, *ids)
+            self.model.soft_delete_dependents(ids, now)
+        return len(ids)
+
+    soft_delete.queryset_only = True
+
+
+class LiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Default to rows that are not soft deleted; the model's all_objects manager sees every row."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset().live()
+        # Lets CachedPrimaryKeyRelatedField resolve ids through the object cache; any further filter or clone
+        # drops the attribute, so only this exact queryset qualifies
+        queryset.object_cache_conditions = {'is_deleted': False}
+        return queryset
+
+
+class SoftDeleteMixin:
+    """
+    Soft delete for models with is_deleted/deleted_at: Model.delete() and QuerySet.delete() flag rows instead
+    of removing them. Models declare `objects = LiveManager()` first, so the default manager used by the admin,
+    serializers' related fields and reverse relations only sees live rows, then `all_objects` for every row, which
+    Meta.base_manager_name makes the manager behind forward relations and the object cache.
+    """
+
+    @classmethod
+    def soft_delete_dependents(cls, ids, now):
+        """Soft delete whatever depends on the rows `ids` that were just soft deleted."""
+
+    def delete(self, using=None, keep_parents=False):
+        """Soft delete - marks the entry (and its dependents) as deleted instead of removing it from the database."""
+        now = timezone.now()
+        type(self).all_objects.using(using or self._state.db).filter(pk=self.pk).soft_delete(now)
+        self.is_deleted = True
+        self.deleted_at = self.updated_at = now
+
+    def hard_delete(self, *args, **kwargs):
+        return super().delete(*args, **kwargs)
+
+
+class Customer(SoftDeleteMixin, ObjectCacheMixin, models.Model):
     SUBSCRIPTION_CHOICES = [
         ('free', 'Standard'),
         ('standard', 'free'),
@@ -26,18 +123,58 @@ class Customer(models.Model):
     
     # Soft delete flag
     is_deleted = models.BooleanField(default=False)
-    
-    def delete(self, using=None, keep_parents=False):
-        """Soft delete - marks the entry as deleted instead of removing it from the database."""
-        self.is_deleted = True
-        self.deleted_at = timezone.now()
-        self.save()
+
+    objects = LiveManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    class Meta:
+        base_manager_name = 'all_objects'
+        indexes = [
+            # Partial index over live rows in list order (created_at, id) for get_customers and its keyset pages
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_deleted=False), name='customer_live_idx'),
+            models.Index(fields=['name'], condition=models.Q(is_deleted=False), name='customer_live_name_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_deleted = instance.__dict__.get('is_deleted')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Deleting or restoring through save() (e.g. the admin) keeps the employees' copy of the flag in step
+        loaded_is_deleted = getattr(self, '_loaded_is_deleted', self.is_deleted)
+        if loaded_is_deleted is not None and loaded_is_deleted != self.is_deleted:
+            Employee.set_customer_deleted([self.pk], self.is_deleted)
+        self._loaded_is_deleted = self.is_deleted
+
+    @classmethod
+    def soft_delete_dependents(cls, ids, now):
+        Employee.set_customer_deleted(ids, True)
+        CustomerCompliance.all_objects.filter(customer_id__in=ids).soft_delete(now)
 
     def __str__(self):
         return self.name
 
 
-class Compliance(models.Model):
+class ComplianceQuerySet(SoftDeleteQuerySet):
+    """Bulk writes (including soft deletes, which update()) move catalog readers on, as Compliance.save() does."""
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        bump_catalog('compliances')
+        return rows
+
+    def hard_delete(self):
+        result = super().hard_delete()
+        bump_catalog('compliances')
+        return result
+
+    hard_delete.queryset_only = True
+
+
+class Compliance(SoftDeleteMixin, ObjectCacheMixin, models.Model):
     COMPLIANCE_CHOICES = [
         ('infosec', 'Infosec Policy'),
         ('acceptable_use', 'Acceptable Use Policy'),
@@ -60,17 +197,55 @@ class Compliance(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
-    # Soft delete functionality
-    def delete(self, using=None, keep_parents=False):
-        """Soft delete - marks the entry as deleted instead of removing it from the database."""
-        self.is_deleted = True
-        self.deleted_at = timezone.now()
-        self.save()
+    objects = LiveManager.from_queryset(ComplianceQuerySet)()
+    all_objects = ComplianceQuerySet.as_manager()
+
+    class Meta:
+        base_manager_name = 'all_objects'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_deleted=False), name='compliance_live_idx'),
+            models.Index(
+                fields=['compliance_title'], condition=models.Q(is_deleted=False), name='compliance_live_title_idx'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_catalog('compliances')
+
+    def hard_delete(self, *args, **kwargs):
+        result = super().hard_delete(*args, **kwargs)
+        bump_catalog('compliances')
+        return result
+
+    @classmethod
+    def soft_delete_dependents(cls, ids, now):
+        CustomerCompliance.all_objects.filter(compliance_id__in=ids).soft_delete(now)
 
     def __str__(self):
         return f"{self.compliance_title} ({self.compliance_type})"
 
 
+class TemplateQuerySet(models.QuerySet):
+    """Bulk writes (including the admin's "delete selected") move template readers on, as Template.save() does."""
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        invalidate_latest_template()
+        transaction.on_commit(invalidate_latest_template)
+        bump_catalog('templates')
+        return rows
+
+    def delete(self):
+        result = super().delete()
+        invalidate_latest_template()
+        transaction.on_commit(invalidate_latest_template)
+        bump_catalog('templates')
+        return result
+
+    delete.queryset_only = True
+
+
 class Template(models.Model):
     name = models.CharField(max_length=255)  # Template name
     description = models.TextField(blank=True, null=True)  # Template description
@@ -82,15 +257,53 @@ class Template(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-created timestamp
     updated_at = models.DateTimeField(auto_now=True)  # Auto-updated timestamp
 
+    objects = TemplateQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'version_number'], name='template_name_version_idx'),
+            # At most one row per name is latest, so this partial index stays tiny
+            models.Index(fields=['name'], condition=models.Q(is_latest=True), name='template_latest_idx'),
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_active=True), name='template_active_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_latest = (instance.__dict__.get('name'), instance.__dict__.get('is_latest'))
+        return instance
+
+    @staticmethod
+    def latest_version(name):
+        """(id, version_number) of the latest version of the template `name`, served from the template cache."""
+        return get_latest_template(
+            name,
+            lambda name: Template.objects.filter(name=name, is_latest=True).values_list('id', 'version_number').first(),
+        )
+
     def save(self, *args, **kwargs):
         """
         Ensure only one version of the same template (by name) is marked as the latest.
         """
         if self.is_latest:
-            # Set `is_latest=False` for all other versions of the same template name
-            Template.objects.filter(name=self.name).update(is_latest=False)
+            # Unset `is_latest` only on the other version(s) of the same template name that still carry it
+            Template.objects.filter(name=self.name, is_latest=True).exclude(pk=self.pk).update(is_latest=False)
         super().save(*args, **kwargs)
 
+        # Drop cached latest-version entries only when this save could have changed which version is latest
+        loaded_name, loaded_is_latest = getattr(self, '_loaded_latest', (None, False))
+        if self.is_latest or loaded_is_latest:
+            names = {self.name, loaded_name} - {None}
+            invalidate_latest_template(*names)
+            transaction.on_commit(lambda: invalidate_latest_template(*names))
+        self._loaded_latest = (self.name, self.is_latest)
+        bump_catalog('templates')
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_catalog('templates')
+        return result
+
     def __str__(self):
         return f"{self.name} - Version {self.version_number}"
 
@@ -121,7 +334,13 @@ class Template(models.Model):
 
 
 
-class Employee(models.Model):
+class EmployeeQuerySet(models.QuerySet):
+    def live(self):
+        """Employees of customers that are not soft deleted, read from the denormalized customer_deleted flag."""
+        return self.filter(customer_deleted=False)
+
+
+class Employee(ObjectCacheMixin, models.Model):
     STATUS_CHOICES = [
         ('active', 'Active'),
         ('inactive', 'Inactive'),
@@ -137,14 +356,46 @@ class Employee(models.Model):
         max_length=10, choices=STATUS_CHOICES, default='active'
     )  # Active/inactive employee
     join_date = models.DateTimeField(null=True, blank=True)  # Employee join date (new field)
+    # Copy of customer.is_deleted, so listing live employees needs no join
+    customer_deleted = models.BooleanField(default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-created timestamp
     updated_at = models.DateTimeField(auto_now=True)  # Auto-updated timestamp
 
+    objects = EmployeeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Live employees in list order for employee_view and its keyset pages
+            models.Index(
+                fields=['created_at', 'id'], condition=models.Q(customer_deleted=False), name='employee_live_idx'
+            ),
+            # Employee filter used by bulk acknowledgement assignment
+            models.Index(fields=['customer', 'status', 'role'], name='employee_customer_status_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # The serializers attach the customer, so the flag usually follows a change of customer for free
+        if Employee.customer.is_cached(self):
+            self.customer_deleted = self.customer.is_deleted
+        elif self.customer_id is not None:
+            self.customer_deleted = Customer.all_objects.filter(pk=self.customer_id).values_list(
+                'is_deleted', flat=True
+            ).first() or False
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def set_customer_deleted(customer_ids, deleted):
+        """Copy a customer's soft delete state onto its employees with one update()."""
+        employees = Employee.objects.filter(customer_id__in=customer_ids).exclude(customer_deleted=deleted)
+        if object_cache(Employee) is not None:
+            invalidate_objects(Employee, *employees.values_list('id', flat=True))
+        return employees.update(customer_deleted=deleted)
+
     def __str__(self):
         return self.name
 
 
-class Policy(models.Model):
+class Policy(SoftDeleteMixin, ObjectCacheMixin, models.Model):
     POLICY_TYPE_CHOICES = [
         ('default', 'Default'),  # Based on a template
         ('custom', 'Custom'),    # Created directly by a customer
@@ -183,19 +434,27 @@ class Policy(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Auto-created timestamp
     updated_at = models.DateTimeField(auto_now=True)  # Auto-updated timestamp
     is_deleted = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    class Meta:
+        base_manager_name = 'all_objects'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], condition=models.Q(is_deleted=False), name='policy_live_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         """
         Automatically set the version for default policies using the associated template.
         Automatically updates approval status when a new policy is created or modified.
         """
-        if self.type == 'default' and self.template:
-            latest_template = Template.objects.filter(
-                name=self.template.name, is_latest=True
-            ).first()
-            if latest_template:
-                self.template = latest_template
-                self.version = latest_template.version_number
+        if self.type == 'default' and self.template_id:
+            latest = Template.latest_version(self.template.name)
+            if latest:
+                # Assigning the id drops the cached template object only when it is not already the latest
+                self.template_id, self.version = latest
         if self.approval_status == 'approved' and not self.approved_at:
             self.approved_at = timezone.now()  # Set approval timestamp if approved
         super().save(*args, **kwargs)
@@ -204,6 +463,42 @@ class Policy(models.Model):
         return f"{self.title} (Type: {self.type}, Version: {self.version}, Status: {self.approval_status})"
 
 
+class PolicyConfigurationQuerySet(models.QuerySet):
+    """Bulk writes (including the admin's "delete selected") refresh snapshots, as PolicyConfiguration.save() does."""
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db):
+            affected = self.snapshot_positions()
+            moved = {'policy', 'policy_id', 'version'} & set(kwargs)
+            ids = list(self.values_list('pk', flat=True)) if moved else None
+            rows = super().update(**kwargs)
+            if moved:
+                # Rows may have moved to another policy or to another version, so rebuild the policies they left
+                # and the ones they joined in full
+                moved_to = PolicyConfiguration.objects.filter(pk__in=ids).snapshot_positions()
+                affected = dict.fromkeys(set(affected) | set(moved_to))
+            self.rebuild_snapshots(affected)
+        return rows
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            affected = self.snapshot_positions()
+            result = super().delete()
+            self.rebuild_snapshots(affected)
+        return result
+
+    delete.queryset_only = True
+
+    def snapshot_positions(self):
+        """{policy_id: lowest version} of the rows in this queryset."""
+        return dict(self.order_by().values_list('policy_id').annotate(Min('version')))
+
+    @staticmethod
+    def rebuild_snapshots(affected):
+        for policy_id, from_version in affected.items():
+            PolicyConfigurationSnapshot.rebuild(policy_id, from_version=from_version)
+
+
 class PolicyConfiguration(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending Approval'),
@@ -219,18 +514,117 @@ class PolicyConfiguration(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Creation timestamp
     updated_at = models.DateTimeField(auto_now=True)  # Last updated timestamp
 
+    objects = PolicyConfigurationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Snapshot rebuilds read one policy's configuration in version order
+            models.Index(fields=['policy', 'version'], name='policy_config_version_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Where the row sat when loaded, so a save that moves it also rebuilds the snapshots it left
+        instance._loaded_position = (instance.__dict__.get('policy_id'), instance.__dict__.get('version'))
+        return instance
+
     def __str__(self):
         return f"Configuration for {self.policy.title} - {self.key}: {self.value} (Version: {self.version})"
     
     def save(self, *args, **kwargs):
         """
-        Automatically set the version of the policy configuration and trigger a policy version increment.
+        Automatically set the version of the policy configuration and trigger a policy version increment,
+        then refresh the configuration snapshots of every policy version this row affects.
         """
-        if not self.version:
-            self.version = self.policy.version + 1  # Increment policy version when a new config is added
-            self.policy.version = self.version  # Update policy version to the new version
-            self.policy.save()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            if not self.version:
+                # Claim the next policy version with one UPDATE rather than re-saving the whole Policy
+                # (which would re-run its template lookup)
+                policy = Policy.all_objects.filter(pk=self.policy_id)
+                policy.update(version=F('version') + 1, updated_at=timezone.now())
+                self.version = policy.values_list('version', flat=True).get()
+                if PolicyConfiguration.policy.is_cached(self):
+                    self.policy.version = self.version
+                invalidate_objects(Policy, self.policy_id)
+            super().save(*args, **kwargs)
+            self.rebuild_snapshots(getattr(self, '_loaded_position', (None, None)))
+        self._loaded_position = (self.policy_id, self.version)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self.rebuild_snapshots(getattr(self, '_loaded_position', (None, None)))
+        return result
+
+    def rebuild_snapshots(self, previous_position):
+        previous_policy_id, previous_version = previous_position
+        if previous_policy_id not in (None, self.policy_id):
+            PolicyConfigurationSnapshot.rebuild(previous_policy_id, from_version=previous_version)
+        from_version = min(version for version in (self.version, previous_version) if version is not None)
+        PolicyConfigurationSnapshot.rebuild(self.policy_id, from_version=from_version)
+
+
+class PolicyConfigurationSnapshot(models.Model):
+    """
+    Compacted effective configuration ({key: value} of the active rows) of a policy at each version that has
+    configuration rows. Maintained by PolicyConfiguration.save()/delete() and its queryset update()/delete(), so
+    reading the configuration in force at version N is a single read of the newest snapshot at or below N.
+    """
+    policy = models.ForeignKey(Policy, on_delete=models.CASCADE, related_name='configuration_snapshots')
+    version = models.PositiveIntegerField()
+    configuration = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Also serves the (policy, version <= N) lookup of effective()
+            models.UniqueConstraint(fields=['policy', 'version'], name='unique_configuration_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"Configuration snapshot of policy {self.policy_id} at version {self.version}"
+
+    @classmethod
+    def effective(cls, policy_id, version=None):
+        """The snapshot in force for `policy_id` at `version` (latest when None), or None if it has no configuration."""
+        snapshots = cls.objects.filter(policy_id=policy_id)
+        if version is not None:
+            snapshots = snapshots.filter(version__lte=version)
+        return snapshots.order_by('-version').first()
+
+    @classmethod
+    def rebuild(cls, policy_id, from_version=None):
+        """
+        Recompute the snapshots of `policy_id` from `from_version` on (all versions when None) out of one ordered
+        read of its configuration rows. Earlier snapshots are left untouched. Returns the number of snapshots written.
+        """
+        rows = PolicyConfiguration.objects.filter(policy_id=policy_id).order_by('version', 'id').values_list(
+            'version', 'key', 'value', 'status'
+        )
+        effective = {}
+        snapshots = {}
+        for version, key, value, status in rows:
+            if status == 'active':
+                effective[key] = value
+            if from_version is None or version >= from_version:
+                snapshots[version] = dict(effective)
+
+        stale = cls.objects.filter(policy_id=policy_id).exclude(version__in=list(snapshots))
+        if from_version is not None:
+            stale = stale.filter(version__gte=from_version)
+        stale.delete()
+        cls.objects.bulk_create(
+            [
+                cls(policy_id=policy_id, version=version, configuration=configuration)
+                for version, configuration in snapshots.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['policy', 'version'],
+            update_fields=['configuration', 'updated_at'],
+        )
+        return len(snapshots)
 
 
 # class CustomerPolicy(models.Model):
@@ -265,6 +659,71 @@ class PolicyConfiguration(models.Model):
 #         super().save(*args, **kwargs)
 
 
+class AcknowledgementQuerySet(models.QuerySet):
+    """
+    Due-date filters that run in SQL against the stored due_date, served by the partial
+    ack_pending_due_idx index (pending rows only) as range scans.
+    """
+
+    def overdue(self, now=None, days=0):
+        """
+        Pending acknowledgements due at least `days` days before `now`. The bound is inclusive, as the escalation
+        sweep has always been: a row due exactly `days` days ago escalates in this sweep.
+        """
+        return self.filter(self.overdue_condition(now, days))
+
+    @staticmethod
+    def overdue_condition(now=None, days=0):
+        """The Q behind overdue(), for aggregates that count overdue rows among others."""
+        now = now or timezone.now()
+        return Q(status='pending', due_date__lte=now - timedelta(days=days))
+
+    def due_within(self, days, now=None):
+        """Pending acknowledgements not yet overdue that fall due in the next `days` days."""
+        now = now or timezone.now()
+        return self.filter(status='pending', due_date__gt=now, due_date__lt=now + timedelta(days=days))
+
+    def acknowledged_late(self):
+        """SQL counterpart of Acknowledgement.is_acknowledged_on_time() being False for acknowledged rows."""
+        return self.filter(status='acknowledged', acknowledged_at__gt=F('due_date'))
+
+    def update(self, **kwargs):
+        """
+        Set-based update that also records History for the Acknowledgement.AUDITED_FIELDS it changes.
+        The matching rows' current values are read first (one query); fields set from an expression are
+        read back after the update, since their new values are only known to the database.
+        """
+        audited = [field for field in Acknowledgement.AUDITED_FIELDS if field in kwargs]
+        if not audited:
+            return super().update(**kwargs)
+
+        computed = [field for field in audited if hasattr(kwargs[field], 'resolve_expression')]
+        assigned = {
+            field: self.model._meta.get_field(field).to_python(kwargs[field])
+            for field in audited if field not in computed
+        }
+        updated_at = kwargs.get('updated_at')
+        if updated_at is None or hasattr(updated_at, 'resolve_expression'):
+            updated_at = timezone.now()
+
+        with transaction.atomic(using=self.db):
+            before = {row[0]: dict(zip(audited, row[1:])) for row in self.values_list('id', *audited)}
+            rows = super().update(**kwargs)
+            after = {}
+            if computed and before:
+                after = {
+                    row[0]: dict(zip(computed, row[1:]))
+                    for row in self.model._base_manager.using(self.db).filter(
+                        id__in=list(before)
+                    ).values_list('id', *computed)
+                }
+            entries = []
+            for pk, old in before.items():
+                entries += history_entries(pk, diff(old, {**assigned, **after.get(pk, {})}), updated_at)
+            record_history(entries, using=self.db)
+        return rows
+
+
 class Acknowledgement(models.Model):
     ACKNOWLEDGEMENT_TYPE_CHOICES = [
         ('new_joiner', 'New Joiner'),
@@ -306,65 +765,318 @@ class Acknowledgement(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AcknowledgementQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Enforced by the database so concurrent creates cannot both pass a duplicate check
+            models.UniqueConstraint(
+                fields=['employee', 'policy', 'policy_version'],
+                name='unique_acknowledgement_per_policy_version',
+            ),
+        ]
+        indexes = [
+            # Serves the escalation sweep's overdue lookup
+            models.Index(fields=['status', 'escalation_status', 'due_date'], name='ack_escalation_idx'),
+            # overdue() / due_within(): only pending rows can be overdue, so acknowledged rows stay out of the index
+            models.Index(fields=['due_date'], condition=models.Q(status='pending'), name='ack_pending_due_idx'),
+            models.Index(fields=['created_at', 'id'], name='ack_list_idx'),
+        ]
+
+    # (current escalation_status, next escalation_status, days overdue, recipient role)
+    ESCALATION_STEPS = (
+        ('escalated_to_hr', 'escalated_to_cxo', 14, 'CXO/CTO'),
+        ('none', 'escalated_to_hr', 7, 'HR'),
+    )
+
+    # Fields whose changes are recorded in History, by save() and by queryset update(); the values loaded
+    # from the database are kept on the instance so save() can diff them without another query
+    AUDITED_FIELDS = ('status', 'acknowledged_at', 'escalation_status', 'due_date')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            field: getattr(instance, field) for field in cls.AUDITED_FIELDS if field in field_names
+        }
+        return instance
+
     def __str__(self):
         return f"{self.employee.name} - {self.policy.title} (Version {self.policy_version})"
     
+    # Time until an acknowledgement falls due, counted from the employee's join date (new_joiner, periodic)
+    # or from when the acknowledgement was created (manual)
+    DUE_DATE_OFFSETS = {
+        'new_joiner': timedelta(days=30),
+        'periodic': timedelta(days=365),  # Example: 1 year after the previous acknowledgment
+        'manual': timedelta(days=30),
+    }
+
+    @staticmethod
+    def calculate_due_date(acknowledgement_type, join_date, now):
+        """Due date for a new acknowledgement, or None for types without a fixed deadline."""
+        offset = Acknowledgement.DUE_DATE_OFFSETS.get(acknowledgement_type)
+        if offset is None:
+            return None
+        return (now if acknowledgement_type == 'manual' else join_date) + offset
+
     def save(self, *args, **kwargs):
         # Set due_date for new joiners, periodic, and manual acknowledgments
         if not self.pk:  # if this is a new instance
-            if self.acknowledgement_type == 'new_joiner':
-                self.due_date = self.employee.join_date + timedelta(days=30)
-            elif self.acknowledgement_type == 'periodic':
-                self.due_date = self.employee.join_date + timedelta(days=365)  # Example: 1 year after the previous acknowledgment
+            if self.acknowledgement_type in ('new_joiner', 'periodic'):
+                self.due_date = self.calculate_due_date(self.acknowledgement_type, self.employee.join_date, None)
             elif self.acknowledgement_type == 'manual':
-                self.due_date = timezone.now() + timedelta(days=30)
+                self.due_date = self.calculate_due_date(self.acknowledgement_type, None, timezone.now())
                 
-        # Validate no duplicate acknowledgments for the same policy version
-        if not self.pk:  # if this is a new instance
-            if Acknowledgement.objects.filter(employee=self.employee, policy=self.policy, policy_version=self.policy_version).exists():
-                raise ValidationError(f"Acknowledgement for employee {self.employee.name} and policy {self.policy.policy.title} (Version {self.policy_version}) already exists.")
-        
-        # Check if acknowledgment is overdue and escalate
-        if self.due_date and self.status == 'pending' and timezone.now() > self.due_date:
-            self.escalate_acknowledgment()
+        # Overdue escalation is handled by the escalate_acknowledgements sweep, not on save
+
+        previous_status = getattr(self, '_loaded_values', {}).get('status')
+        newly_acknowledged = self.status == 'acknowledged' and previous_status != 'acknowledged'
 
         # Audit trail logic: Create a history record for critical field changes
         if self.pk:  # If it's an update, log the change
-            self.create_audit_trail()
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self.create_audit_trail(kwargs.get('update_fields'))
+                customer_compliance_id, customer_id = self.customer_compliance_ids()
+                self.update_compliance_counts(previous_status, customer_compliance_id)
+                if newly_acknowledged:
+                    self.send_acknowledgment_confirmation_email()
+                self.invalidate_compliance_dashboards([customer_id])
+        else:
+            # Duplicates for the same policy version are rejected by the unique constraint instead of a
+            # pre-insert exists() probe; the savepoint keeps an outer transaction usable after the failure.
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                    customer_compliance_id, customer_id = self.customer_compliance_ids()
+                    self.update_compliance_counts(previous_status, customer_compliance_id)
+                    if newly_acknowledged:
+                        self.send_acknowledgment_confirmation_email()
+                    self.invalidate_compliance_dashboards([customer_id])
+            except IntegrityError:
+                if Acknowledgement.objects.filter(
+                    employee_id=self.employee_id, policy_id=self.policy_id, policy_version=self.policy_version
+                ).exists():
+                    raise ValidationError(f"Acknowledgement for employee {self.employee.name} and policy {self.policy.title} (Version {self.policy_version}) already exists.")
+                raise
+        self._loaded_values = {field: getattr(self, field) for field in self.AUDITED_FIELDS}
 
-        super().save(*args, **kwargs)
+    @classmethod
+    def bulk_assign(cls, policy, employees, acknowledgement_type, batch_size=2000):
+        """
+        Create pending acknowledgements of `policy` at its current version for every employee in `employees`.
+        Employees are read as (id, join_date) rows and inserted in chunks with bulk_create, so save() and its
+        per-row employee fetch are skipped. Employees that already have an acknowledgement for this version,
+        including ones inserted concurrently, are counted as skipped. Returns (created, skipped).
+        """
+        now = timezone.now()
+        created = skipped = 0
+        rows = employees.order_by('id').values_list('id', 'join_date').iterator(chunk_size=batch_size)
 
-    def escalate_acknowledgment(self):
-        """Escalate acknowledgment to HR and then CXO/CTO based on overdue threshold."""
-        overdue_days = (timezone.now() - self.due_date).days
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            assigned = cls.objects.filter(
+                policy=policy, policy_version=policy.version, employee_id__in=[pk for pk, _ in chunk]
+            )
+            existing = set(assigned.values_list('employee_id', flat=True))
+            # Employees without a join date are measured from the rollout time
+            new_rows = [
+                cls(
+                    policy=policy,
+                    employee_id=pk,
+                    policy_version=policy.version,
+                    acknowledgement_type=acknowledgement_type,
+                    due_date=cls.calculate_due_date(acknowledgement_type, join_date or now, now),
+                )
+                for pk, join_date in chunk if pk not in existing
+            ]
+            # ignore_conflicts leaves rows inserted concurrently since the check above to the unique constraint,
+            # so the rows actually inserted are counted by reading the chunk back rather than taken from new_rows
+            with transaction.atomic():
+                cls.objects.bulk_create(new_rows, batch_size=batch_size, ignore_conflicts=True)
+                inserted = assigned.count() - len(existing) if new_rows else 0
+                CustomerCompliance.adjust_counts(policy.customer_compliance_id, pending=inserted)
+            created += inserted
+            skipped += len(chunk) - inserted
+        if created and policy.customer_compliance_id:
+            cls.invalidate_compliance_dashboards([policy.customer_compliance.customer_id])
+        return created, skipped
 
-        if self.escalation_status == 'none' and overdue_days >= 7:
-            self.escalation_status = 'escalated_to_hr'
-            self.save()
-            # Send email to HR about the overdue acknowledgment
-            self.send_escalation_email('HR')
+    @classmethod
+    def bulk_acknowledge(cls, employee, ids=None, now=None):
+        """
+        Acknowledge `employee`'s pending acknowledgements among `ids` (all of them when `ids` is None) in a
+        fixed number of queries: one locking read, one audited update() stamping acknowledged_at, two counter
+        updates, one combined confirmation email and one History insert on commit. Returns the acknowledged ids.
+        """
+        now = now or timezone.now()
+        pending = cls.objects.filter(employee=employee, status='pending')
+        if ids is not None:
+            pending = pending.filter(id__in=ids)
 
-        elif self.escalation_status == 'escalated_to_hr' and overdue_days >= 14:
-            self.escalation_status = 'escalated_to_cxo'
-            self.save()
-            # Send email to CXO/CTO about the overdue acknowledgment
-            self.send_escalation_email('CXO/CTO')
+        with transaction.atomic():
+            rows = list(
+                pending.select_for_update(of=('self',)).order_by('id').values_list(
+                    'id', 'policy_id', 'policy__title', 'policy_version', 'policy__customer_compliance_id',
+                    'policy__customer_compliance__customer_id',
+                )
+            )
+            if not rows:
+                return []
+            acknowledged = [row[0] for row in rows]
+            cls.objects.filter(id__in=acknowledged).update(status='acknowledged', acknowledged_at=now, updated_at=now)
 
-    def send_escalation_email(self, role):
-        """Send email to notify stakeholders (HR or CXO/CTO) about escalation."""
+            counts = Counter(row[4] for row in rows)
+            CustomerCompliance.adjust_counts_many({pk: (count, -count) for pk, count in counts.items()})
+
+            subject = "Policy Acknowledgment Confirmation"
+            policies = "\n".join(f"- {title} (Version {version})" for _, _, title, version, *_ in rows)
+            message = (
+                f"Dear {employee.name},\n\nYou have successfully acknowledged the following policies:\n"
+                f"{policies}\n\nThank you!"
+            )
+            Notification.objects.bulk_create(Notification.build([employee.email], subject, message))
+            cls.invalidate_compliance_dashboards({row[5] for row in rows})
+        return acknowledged
+
+    @staticmethod
+    def invalidate_compliance_dashboards(customer_ids):
+        """
+        Once the current transaction commits, drop the cached dashboards of `customer_ids`, which callers take
+        from the policy__customer_compliance__customer_id they already read (None for unlinked policies).
+        """
+        customer_ids = {customer_id for customer_id in customer_ids if customer_id is not None}
+        transaction.on_commit(lambda: invalidate_compliance_dashboard(customer_ids))
+
+    @classmethod
+    def compliance_summary(cls, customer_id=None, now=None):
+        """
+        Per customer and compliance, count acknowledged, pending, overdue and escalated acknowledgements
+        in a single grouped query over Acknowledgement -> Policy -> CustomerCompliance.
+        """
+        now = now or timezone.now()
+        acknowledgements = cls.objects.filter(policy__customer_compliance__isnull=False)
+        if customer_id:
+            acknowledgements = acknowledgements.filter(policy__customer_compliance__customer_id=customer_id)
+        return list(
+            acknowledgements.values(
+                customer_compliance=F('policy__customer_compliance_id'),
+                customer=F('policy__customer_compliance__customer_id'),
+                compliance=F('policy__customer_compliance__compliance_id'),
+                compliance_title=F('policy__customer_compliance__compliance__compliance_title'),
+            ).annotate(
+                acknowledged=Count('id', filter=Q(status='acknowledged')),
+                pending=Count('id', filter=Q(status='pending')),
+                overdue=Count('id', filter=AcknowledgementQuerySet.overdue_condition(now)),
+                escalated=Count('id', filter=~Q(escalation_status='none')),
+            ).order_by('customer', 'compliance', 'customer_compliance')
+        )
+
+    def update_compliance_counts(self, previous_status, customer_compliance_id):
+        """Move this acknowledgement between its CustomerCompliance's pending and acknowledged counters."""
+        if previous_status == self.status:
+            return
+        deltas = {'acknowledged': 0, 'pending': 0}
+        if previous_status in deltas:
+            deltas[previous_status] -= 1
+        if self.status in deltas:
+            deltas[self.status] += 1
+        CustomerCompliance.adjust_counts(customer_compliance_id, **deltas)
+
+    def customer_compliance_ids(self):
+        """
+        (customer_compliance_id, customer_id) of the policy, from the Policy and CustomerCompliance fetched with
+        this acknowledgement (acknowledgement_view selects policy__customer_compliance) when they are loaded,
+        else from a single values_list read of the two columns.
+        """
+        if Acknowledgement.policy.is_cached(self):
+            policy = self.policy
+            if policy.customer_compliance_id is None:
+                return None, None
+            if Policy.customer_compliance.is_cached(policy):
+                return policy.customer_compliance_id, policy.customer_compliance.customer_id
+        ids = Policy.all_objects.filter(pk=self.policy_id).values_list(
+            'customer_compliance_id', 'customer_compliance__customer_id'
+        ).first()
+        return ids or (None, None)
+
+    @classmethod
+    def escalate_overdue(cls, now=None):
+        """
+        Advance overdue pending acknowledgements one escalation level: to HR after 7 days, then to CXO/CTO after 14.
+        Each level is one indexed select on (status, escalation_status, due_date) plus one set-based update().
+        Returns {role: [acknowledgement ids]} for the rows escalated in this sweep.
+        """
+        now = now or timezone.now()
+        escalated = {}
+        with transaction.atomic():
+            # Run the later level first so a row advances at most one level per sweep
+            for current, target, overdue_days, role in cls.ESCALATION_STEPS:
+                ids = list(
+                    cls.objects.select_for_update(skip_locked=True).overdue(now, days=overdue_days).filter(
+                        escalation_status=current
+                    ).values_list('id', flat=True)
+                )
+                if ids:
+                    cls.objects.filter(id__in=ids).update(escalation_status=target, updated_at=now)
+                    # Queue the emails in the same transaction so they exist exactly when the escalation does
+                    escalated_rows = list(
+                        cls.objects.select_related('policy__customer_compliance', 'employee').filter(id__in=ids)
+                    )
+                    Notification.objects.bulk_create([
+                        notification
+                        for acknowledgement in escalated_rows
+                        for notification in acknowledgement.escalation_notifications(role)
+                    ])
+                    cls.invalidate_compliance_dashboards({
+                        acknowledgement.policy.customer_compliance.customer_id
+                        for acknowledgement in escalated_rows if acknowledgement.policy.customer_compliance_id
+                    })
+                    escalated[role] = ids
+        return escalated
+
+    def escalation_notifications(self, role):
+        """Build (unsaved) outbox rows notifying stakeholders (HR or CXO/CTO) about escalation."""
         subject = f"Overdue Acknowledgment - Escalated to {role}"
-        message = f"Dear {role},\n\nThe acknowledgment for the policy '{self.policy.policy.title}' by {self.employee.name} is overdue and has been escalated."
+        message = f"Dear {role},\n\nThe acknowledgment for the policy '{self.policy.title}' by {self.employee.name} is overdue and has been escalated."
         recipient = ['hr@company.com'] if role == 'HR' else ['cxo@company.com', 'cto@company.com']
 
-        send_mail(subject, message, 'no-reply@company.com', recipient)
+        return Notification.build(recipient, subject, message)
+
+    def send_escalation_email(self, role):
+        """Queue email to notify stakeholders (HR or CXO/CTO) about escalation."""
+        Notification.objects.bulk_create(self.escalation_notifications(role))
 
     def send_acknowledgment_confirmation_email(self):
-        """Send email to employee confirming successful acknowledgment."""
+        """Queue email to employee confirming successful acknowledgment."""
         subject = f"Policy Acknowledgment Confirmation"
-        message = f"Dear {self.employee.name},\n\nYou have successfully acknowledged the policy '{self.policy.policy.title}' (Version {self.policy_version}). Thank you!"
+        message = f"Dear {self.employee.name},\n\nYou have successfully acknowledged the policy '{self.policy.title}' (Version {self.policy_version}). Thank you!"
         recipient = [self.employee.email]
 
-        send_mail(subject, message, 'no-reply@company.com', recipient)
+        Notification.objects.bulk_create(Notification.build(recipient, subject, message))
+
+    @classmethod
+    def backfill_due_dates(cls):
+        """
+        Store due dates on rows created without one, following calculate_due_date() with one UPDATE per
+        acknowledgement type (manual rows count from their creation). Returns the number of rows updated.
+        """
+        join_date = Employee.objects.filter(pk=models.OuterRef('employee_id')).values('join_date')[:1]
+        missing = cls.objects.filter(due_date__isnull=True)
+        updated = 0
+        for acknowledgement_type, offset in cls.DUE_DATE_OFFSETS.items():
+            if acknowledgement_type == 'manual':
+                rows, start = missing.filter(acknowledgement_type='manual'), F('created_at')
+            else:
+                rows = missing.filter(acknowledgement_type=acknowledgement_type, employee__join_date__isnull=False)
+                start = models.Subquery(join_date)
+            updated += rows.update(
+                due_date=ExpressionWrapper(start + Value(offset), output_field=models.DateTimeField())
+            )
+        return updated
 
     def is_acknowledged_on_time(self):
         """Check if acknowledgment was completed within the due date."""
@@ -372,24 +1084,16 @@ class Acknowledgement(models.Model):
             return self.acknowledged_at <= self.due_date
         return False
 
-    def create_audit_trail(self):
-        """Create an audit record when important fields are updated."""
-        if self.status == 'acknowledged' and self.acknowledged_at and not self.history.exists():
-            History.objects.create(
-                acknowledgement=self,
-                field='status',
-                old_value='pending',
-                new_value=self.status,
-                updated_at=self.updated_at
-            )
-        elif self.status == 'pending' and self.acknowledged_at:
-            History.objects.create(
-                acknowledgement=self,
-                field='acknowledged_at',
-                old_value=None,
-                new_value=self.acknowledged_at,
-                updated_at=self.updated_at
-            )
+    def create_audit_trail(self, update_fields=None):
+        """
+        Queue History rows for the audited fields whose values differ from those loaded from the database.
+        They are written with the rest of the transaction's History in one bulk_create on commit.
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        if update_fields is not None:
+            loaded = {field: value for field, value in loaded.items() if field in update_fields}
+        changes = diff(loaded, {field: getattr(self, field) for field in loaded})
+        record_history(history_entries(self.pk, changes, self.updated_at), using=self._state.db)
 
 
 class History(models.Model):
@@ -403,10 +1107,18 @@ class History(models.Model):
     new_value = models.TextField(null=True, blank=True)
     updated_at = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            # Retention sweeps and time-range exports
+            models.Index(fields=['updated_at', 'id'], name='history_updated_at_idx'),
+            # Per-acknowledgement trail, newest first
+            models.Index(fields=['acknowledgement', '-updated_at'], name='history_ack_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Audit for {self.acknowledgement} - {self.field}"
 
-class CustomerCompliance(models.Model):
+class CustomerCompliance(SoftDeleteMixin, models.Model):
     customer = models.ForeignKey('Customer', on_delete=models.CASCADE)
     compliance = models.ForeignKey('Compliance', on_delete=models.CASCADE)
     
@@ -440,8 +1152,131 @@ class CustomerCompliance(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # When the record was created
     updated_at = models.DateTimeField(auto_now=True)  # When the record was last updated
 
+    # Soft deleted along with its customer or compliance
+    is_deleted = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LiveManager()
+    all_objects = SoftDeleteQuerySet.as_manager()
+
+    class Meta:
+        base_manager_name = 'all_objects'
+
+    @classmethod
+    def soft_delete_dependents(cls, ids, now):
+        Policy.all_objects.filter(customer_compliance_id__in=ids).soft_delete(now)
+
     def __str__(self):
-        return f"Compliance for {self.customer.name} - {self.compliance.name} (Status: {self.status})"
+        return f"Compliance for {self.customer.name} - {self.compliance.compliance_title} (Status: {self.status})"
 
+    @staticmethod
+    def percentage_expression():
+        """SQL expression computing compliance_percentage from the stored counters."""
+        percentage_field = models.DecimalField(max_digits=5, decimal_places=2)
+        return Case(
+            When(acknowledged_count=0, pending_count=0, then=Value(Decimal('0.00'))),
+            default=ExpressionWrapper(
+                F('acknowledged_count') * Decimal('100.00') / (F('acknowledged_count') + F('pending_count')),
+                output_field=percentage_field,
+            ),
+            output_field=percentage_field,
+        )
 
+    @classmethod
+    def adjust_counts(cls, customer_compliance_id, acknowledged=0, pending=0):
+        """
+        Apply acknowledgement count deltas with atomic F() updates so concurrent writers never lose an increment.
+        The percentage is recomputed in a second statement so it always reads the already-updated counters.
+        """
+        cls.adjust_counts_many({customer_compliance_id: (acknowledged, pending)})
 
+    @classmethod
+    def adjust_counts_many(cls, deltas):
+        """
+        adjust_counts for several rows at once, from {customer_compliance_id: (acknowledged, pending)},
+        still in two statements whatever the number of rows.
+        """
+        deltas = {pk: delta for pk, delta in deltas.items() if pk and any(delta)}
+        if not deltas:
+            return
+
+        def delta_for(index):
+            return Case(
+                *[When(id=pk, then=Value(delta[index])) for pk, delta in deltas.items()],
+                default=Value(0),
+                output_field=models.IntegerField(),
+            )
+
+        rows = cls.all_objects.filter(id__in=list(deltas))
+        with transaction.atomic():
+            rows.update(
+                acknowledged_count=Greatest(F('acknowledged_count') + delta_for(0), 0),
+                pending_count=Greatest(F('pending_count') + delta_for(1), 0),
+                updated_at=timezone.now(),
+            )
+            rows.update(compliance_percentage=cls.percentage_expression())
+
+    @classmethod
+    def reconcile(cls, customer_id):
+        """
+        Recompute the counters of one customer's compliances from Acknowledgement with a single grouped
+        aggregate, repairing any drift in the incrementally maintained values. Returns the number of rows fixed.
+        """
+        totals = {
+            row['policy__customer_compliance']: row
+            for row in Acknowledgement.objects.filter(
+                policy__customer_compliance__customer_id=customer_id
+            ).values('policy__customer_compliance').annotate(
+                acknowledged=Count('id', filter=Q(status='acknowledged')),
+                pending=Count('id', filter=Q(status='pending')),
+            )
+        }
+
+        drifted = []
+        for customer_compliance in cls.all_objects.filter(customer_id=customer_id):
+            row = totals.get(customer_compliance.id, {'acknowledged': 0, 'pending': 0})
+            total = row['acknowledged'] + row['pending']
+            percentage = (
+                (Decimal(row['acknowledged']) * 100 / total).quantize(Decimal('0.01')) if total else Decimal('0.00')
+            )
+            if (customer_compliance.acknowledged_count, customer_compliance.pending_count,
+                    customer_compliance.compliance_percentage) != (row['acknowledged'], row['pending'], percentage):
+                customer_compliance.acknowledged_count = row['acknowledged']
+                customer_compliance.pending_count = row['pending']
+                customer_compliance.compliance_percentage = percentage
+                drifted.append(customer_compliance)
+
+        cls.all_objects.bulk_update(drifted, ['acknowledged_count', 'pending_count', 'compliance_percentage'])
+        return len(drifted)
+
+
+class Notification(models.Model):
+    """Transactional outbox for outgoing email; rows are delivered by the dispatch_notifications command."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)  # Delivery attempts made so far
+    next_attempt_at = models.DateTimeField(default=timezone.now)  # Not retried before this time
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_due_idx'),
+        ]
+
+    @classmethod
+    def build(cls, recipients, subject, body):
+        """Unsaved outbox rows, one per recipient, ready for bulk_create."""
+        return [cls(recipient=recipient, subject=subject, body=body) for recipient in recipients]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.recipient} ({self.status})"
\ No newline at end of file
@@ -0,0 +1,100 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Notification
+
+NOTIFICATION_FROM_EMAIL = 'no-reply@company.com'
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = timedelta(minutes=1)  # Doubled after every failed attempt
+# How long claimed rows are reserved for the dispatcher sending them; they are retried after that if it dies
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+def build_message(recipient, subject, notifications, connection):
+    """One email per (recipient, subject); several queued notifications are combined into a digest."""
+    if len(notifications) == 1:
+        body = notifications[0].body
+    else:
+        subject = f"{subject} ({len(notifications)} items)"
+        body = "\n\n----------\n\n".join(notification.body for notification in notifications)
+    return EmailMessage(subject, body, NOTIFICATION_FROM_EMAIL, [recipient], connection=connection)
+
+
+def record_failure(notifications, error, now):
+    for notification in notifications:
+        notification.attempts += 1
+        notification.last_error = error
+        if notification.attempts >= MAX_ATTEMPTS:
+            notification.status = 'failed'
+        else:
+            notification.next_attempt_at = now + RETRY_BASE_DELAY * 2 ** (notification.attempts - 1)
+
+
+def claim_due(batch_size, now):
+    """
+    Lease up to `batch_size` due rows to this dispatcher in a short transaction of its own: their next_attempt_at
+    moves CLAIM_LEASE ahead, so other dispatchers skip them while they are sent and they become due again if this
+    one dies before recording the outcome.
+    """
+    with transaction.atomic():
+        due = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        if due:
+            Notification.objects.filter(id__in=[notification.id for notification in due]).update(
+                next_attempt_at=now + CLAIM_LEASE
+            )
+    return due
+
+
+def dispatch_notifications(batch_size=500, now=None):
+    """
+    Deliver due outbox rows over a single email connection.
+    Rows for the same recipient and subject go out as one digest; failed groups are retried with exponential
+    backoff until MAX_ATTEMPTS. Rows are claimed and their outcome recorded in two short transactions, so no
+    database transaction or row lock is held while talking to the mail server. Returns (sent, failed) counts of
+    outbox rows.
+    """
+    now = now or timezone.now()
+    sent = failed = 0
+    due = claim_due(batch_size, now)
+    if not due:
+        return sent, failed
+
+    groups = defaultdict(list)
+    for notification in due:
+        groups[(notification.recipient, notification.subject)].append(notification)
+
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        record_failure(due, str(e), now)
+        failed = len(due)
+    else:
+        try:
+            for (recipient, subject), notifications in groups.items():
+                try:
+                    connection.send_messages([build_message(recipient, subject, notifications, connection)])
+                except Exception as e:
+                    record_failure(notifications, str(e), now)
+                    failed += len(notifications)
+                else:
+                    for notification in notifications:
+                        notification.status = 'sent'
+                        notification.sent_at = now
+                    sent += len(notifications)
+        finally:
+            connection.close()
+
+    with transaction.atomic():
+        Notification.objects.bulk_update(
+            due, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'], batch_size=batch_size
+        )
+    return sent, failed
@@ -0,0 +1,180 @@
+import csv
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .caching import invalidate_objects, object_cache
+from .models import Customer, Employee
+
+EMPLOYEE_UPSERT_BATCH_SIZE = 1000
+# customer_deleted is False on every row, since rows are only applied for live customers
+EMPLOYEE_UPSERT_FIELDS = ['name', 'customer', 'customer_deleted', 'role', 'updated_at']
+# Updated on existing employees only when the feed row has a value for them
+EMPLOYEE_OPTIONAL_FIELDS = ('status', 'join_date')
+EMPLOYEE_STATUSES = dict(Employee.STATUS_CHOICES)
+
+
+def parse_join_date(value):
+    if value in (None, ''):
+        return None
+    try:
+        day = parse_date(value)
+        moment = parse_datetime(value) if day is None else datetime.combine(day, datetime.min.time())
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError("Must be an ISO 8601 date or datetime.")
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+def clean_employee_row(row):
+    """Validate one feed row without touching the database; returns (Employee, errors)."""
+    errors = {}
+    values = {key: (str(value).strip() if value is not None else '') for key, value in row.items()}
+
+    for field in ('email', 'name', 'customer', 'role'):
+        if not values.get(field):
+            errors[field] = "This field is required."
+
+    for field in ('email', 'name', 'role'):
+        max_length = Employee._meta.get_field(field).max_length
+        if field not in errors and len(values[field]) > max_length:
+            errors[field] = f"Ensure this field has no more than {max_length} characters."
+
+    email = values.get('email', '')
+    if email and 'email' not in errors:
+        try:
+            validate_email(email)
+        except ValidationError:
+            errors['email'] = "Enter a valid email address."
+
+    customer = values.get('customer', '')
+    if customer and not customer.isdigit():
+        errors['customer'] = "Must be a customer id."
+
+    employee_status = values.get('status') or 'active'
+    if employee_status not in EMPLOYEE_STATUSES:
+        errors['status'] = f"Must be one of: {', '.join(EMPLOYEE_STATUSES)}."
+
+    try:
+        join_date = parse_join_date(values.get('join_date'))
+    except ValueError as e:
+        errors['join_date'] = str(e)
+        join_date = None
+
+    if errors:
+        return None, errors
+    employee = Employee(
+        email=email,
+        name=values['name'],
+        customer_id=int(customer),
+        role=values['role'],
+        status=employee_status,
+        join_date=join_date,
+    )
+    employee._supplied_fields = tuple(field for field in EMPLOYEE_OPTIONAL_FIELDS if values.get(field))
+    return employee, {}
+
+
+def record_failure(report, index, email, errors):
+    report["failed"] += 1
+    report["errors"].append({"row": index, "email": email, "errors": errors})
+
+
+class InvalidUpload(ValueError):
+    """Raised when the body of a bulk upload cannot be read as rows (malformed CSV, undecodable text)."""
+
+
+def clean_employee_rows(rows, report):
+    """
+    Read and validate every feed row before anything is written, recording failures in `report`.
+    Returns [(row number, Employee)] for the rows that passed. Raises InvalidUpload when the body itself
+    cannot be read, which for a streamed CSV only shows up while its rows are iterated.
+    """
+    candidates = []
+    seen_emails = set()
+    rows = iter(rows)
+    index = 0
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            break
+        except (csv.Error, UnicodeDecodeError) as e:
+            raise InvalidUpload(f"Row {index + 1} could not be read: {e}")
+        index += 1
+
+        if not isinstance(row, dict):
+            record_failure(report, index, None, {"row": "Must be an object."})
+            continue
+        employee, errors = clean_employee_row(row)
+        if not errors and employee.email in seen_emails:
+            errors = {"email": "Duplicate email in this batch."}
+        if errors:
+            record_failure(report, index, row.get('email'), errors)
+            continue
+        seen_emails.add(employee.email)
+        candidates.append((index, employee))
+    report["rows"] = index
+    return candidates
+
+
+def upsert_employees(rows, batch_size=EMPLOYEE_UPSERT_BATCH_SIZE):
+    """
+    Create or update employees keyed by email from an iterable of dicts (a JSON array or csv.DictReader).
+    The whole body is read and validated in memory first, so no transaction is open while an upload streams in
+    and an unreadable body (InvalidUpload) writes nothing. Customers are then checked once per chunk, and each
+    chunk is written with a single bulk_create(update_conflicts=True), all inside one transaction.
+    Returns a report with per-row errors.
+    """
+    started = time.perf_counter()
+    report = {"rows": 0, "applied": 0, "failed": 0, "errors": []}
+    candidates = clean_employee_rows(rows, report)
+
+    with transaction.atomic():
+        for offset in range(0, len(candidates), batch_size):
+            chunk = candidates[offset:offset + batch_size]
+
+            # One query validates every customer referenced by the chunk
+            live_customers = set(
+                Customer.objects.filter(
+                    id__in={employee.customer_id for _, employee in chunk}
+                ).values_list('id', flat=True)
+            )
+            employees = []
+            for index, employee in chunk:
+                if employee.customer_id in live_customers:
+                    employees.append(employee)
+                else:
+                    record_failure(report, index, employee.email, {"customer": "Customer not found or is deleted."})
+
+            # Optional columns only overwrite existing employees when the row supplied them, so rows are
+            # grouped by which optional fields they carry (at most one bulk statement per combination)
+            groups = defaultdict(list)
+            for employee in employees:
+                groups[employee._supplied_fields].append(employee)
+            for supplied_fields, group in groups.items():
+                Employee.objects.bulk_create(
+                    group,
+                    update_conflicts=True,
+                    unique_fields=['email'],
+                    update_fields=EMPLOYEE_UPSERT_FIELDS + list(supplied_fields),
+                )
+            report["applied"] += len(employees)
+            # bulk_create bypasses save(), so drop the object cache entries of the updated employees here
+            if employees and object_cache(Employee) is not None:
+                invalidate_objects(Employee, *Employee.objects.filter(
+                    email__in=[employee.email for employee in employees]
+                ).values_list('id', flat=True))
+
+    report["errors"].sort(key=lambda error: error["row"])
+    elapsed = time.perf_counter() - started
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(report["rows"] / elapsed, 1) if elapsed else None
+    return report
@@ -0,0 +1,17 @@
+import codecs
+import csv
+
+from rest_framework.parsers import BaseParser
+
+
+class CSVStreamParser(BaseParser):
+    """
+    Parse a text/csv request body into a lazy csv.DictReader.
+    Lines are decoded as they are read from the request stream, so the raw upload is never held in memory at once.
+    A malformed or undecodable body therefore only raises (csv.Error, UnicodeDecodeError) while the rows are iterated.
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return csv.DictReader(codecs.iterdecode(stream, encoding))
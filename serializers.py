@@ -1,12 +1,99 @@
+import copy
+import threading
+
+from django.core.exceptions import ObjectDoesNotExist
 from rest_framework import serializers
 
+from .caching import object_cache
+
+
+class InvalidFieldSelection(ValueError):
+    """Raised when a `fields` query parameter names fields the serializer does not have."""
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves foreign keys through the related model's object cache when the field accepts any row of the table,
+    or only the live rows of a soft-deletable one (the default manager's queryset).
+    """
+
+    def to_internal_value(self, data):
+        queryset = self.get_queryset()
+        store = object_cache(queryset.model)
+        conditions = getattr(queryset, 'object_cache_conditions', {})
+        if store is None or (queryset.query.where and not conditions) or self.pk_field is not None:
+            return super().to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            return store.get(data, **conditions)
+        except ObjectDoesNotExist:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
 class CommonSerializer(serializers.ModelSerializer):
+    """
+    Base class for the per-model serializers returned by `serializer_for`.
+    The field map is introspected once per subclass and deep-copied for each instance.
+    Pass `fields=[...]` to limit the output to those fields; input validation still sees every field.
+    """
+    _fields_cache = None
+    serializer_related_field = CachedPrimaryKeyRelatedField
+
     def __init__(self, *args, **kwargs):
-        model = kwargs.pop('model', None)  # Extract the model from kwargs
-        if model:
-            self.Meta.model = model  # Dynamically set the model
+        self.output_fields = kwargs.pop('fields', None)
         super().__init__(*args, **kwargs)
 
+    @property
+    def _readable_fields(self):
+        for field in super()._readable_fields:
+            if self.output_fields is None or field.field_name in self.output_fields:
+                yield field
+
+    @classmethod
+    def field_names(cls):
+        if cls.__dict__.get('_fields_cache') is None:
+            cls().fields  # Populates the cache
+        return list(cls._fields_cache)
+
+    @classmethod
+    def parse_fields(cls, value):
+        """Turn a comma-separated `fields` query parameter into a list of field names, or None when absent."""
+        if not value:
+            return None
+        requested = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = sorted(set(requested) - set(cls.field_names()))
+        if unknown:
+            raise InvalidFieldSelection(f"Unknown fields: {', '.join(unknown)}.")
+        return requested
+
+    def get_fields(self):
+        cls = type(self)
+        if cls.__dict__.get('_fields_cache') is None:
+            cls._fields_cache = super().get_fields()
+        return copy.deepcopy(cls._fields_cache)
+
     class Meta:
-        model = None  # Default model is None
-        fields = '__all__'
\ No newline at end of file
+        model = None  # Set on each subclass by serializer_for()
+        fields = '__all__'
+
+
+_serializer_classes = {}
+_serializer_classes_lock = threading.Lock()
+
+
+def serializer_for(model):
+    """Return the cached CommonSerializer subclass for `model`, building it on first use."""
+    serializer_class = _serializer_classes.get(model)
+    if serializer_class is None:
+        with _serializer_classes_lock:
+            serializer_class = _serializer_classes.get(model)
+            if serializer_class is None:
+                meta = type('Meta', (CommonSerializer.Meta,), {'model': model})
+                serializer_class = type(
+                    f'{model.__name__}Serializer', (CommonSerializer,), {'Meta': meta}
+                )
+                _serializer_classes[model] = serializer_class
+    return serializer_class
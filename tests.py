@@ -0,0 +1,301 @@
+from datetime import timedelta
+from smtplib import SMTPException
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.admin.templatetags.admin_list import results
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from .archive import archive_history
+from .caching import catalog_cache
+from .instrumentation import QueryInstrumentationMiddleware, request_stats, reset_request_stats
+from .models import (
+    Acknowledgement, Compliance, Customer, CustomerCompliance, Employee, History, Notification, Policy,
+    PolicyConfiguration, PolicyConfigurationSnapshot, Template,
+)
+from .notifications import CLAIM_LEASE, MAX_ATTEMPTS, RETRY_BASE_DELAY, dispatch_notifications
+from .views import acknowledgement_assign_view
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class DispatchNotificationsTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+
+    def queue(self, recipient, subject, body, **fields):
+        fields.setdefault('next_attempt_at', self.now)
+        return Notification.objects.create(recipient=recipient, subject=subject, body=body, **fields)
+
+    def test_rows_for_the_same_recipient_and_subject_are_sent_as_one_digest(self):
+        self.queue('a@example.com', 'Reminder', 'first')
+        self.queue('a@example.com', 'Reminder', 'second')
+        self.queue('b@example.com', 'Reminder', 'third')
+
+        self.assertEqual(dispatch_notifications(now=self.now), (3, 0))
+
+        self.assertEqual(len(mail.outbox), 2)
+        digest = next(message for message in mail.outbox if message.to == ['a@example.com'])
+        self.assertEqual(digest.subject, 'Reminder (2 items)')
+        self.assertIn('first', digest.body)
+        self.assertIn('second', digest.body)
+        self.assertFalse(Notification.objects.exclude(status='sent').exists())
+
+    def test_rows_not_yet_due_are_left_alone(self):
+        self.queue('a@example.com', 'Reminder', 'later', next_attempt_at=self.now + timedelta(minutes=5))
+
+        self.assertEqual(dispatch_notifications(now=self.now), (0, 0))
+        self.assertEqual(mail.outbox, [])
+
+    def test_failed_send_backs_off_exponentially(self):
+        notification = self.queue('a@example.com', 'Reminder', 'body', attempts=2)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', side_effect=SMTPException('refused')):
+            self.assertEqual(dispatch_notifications(now=self.now), (0, 1))
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'pending')
+        self.assertEqual(notification.attempts, 3)
+        self.assertEqual(notification.last_error, 'refused')
+        self.assertEqual(notification.next_attempt_at, self.now + RETRY_BASE_DELAY * 4)
+
+    def test_gives_up_after_max_attempts(self):
+        notification = self.queue('a@example.com', 'Reminder', 'body', attempts=MAX_ATTEMPTS - 1)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', side_effect=SMTPException('refused')):
+            dispatch_notifications(now=self.now)
+
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, 'failed')
+        self.assertEqual(notification.attempts, MAX_ATTEMPTS)
+        self.assertEqual(dispatch_notifications(now=self.now + timedelta(days=1)), (0, 0))
+
+    def test_rows_are_claimed_before_sending(self):
+        notification = self.queue('a@example.com', 'Reminder', 'body')
+
+        def send_messages(backend, messages):
+            # Committed before the send, so another dispatcher would skip the row until the lease runs out
+            self.assertEqual(
+                Notification.objects.get(pk=notification.pk).next_attempt_at, self.now + CLAIM_LEASE
+            )
+            return len(messages)
+
+        with mock.patch.object(locmem.EmailBackend, 'send_messages', send_messages):
+            self.assertEqual(dispatch_notifications(now=self.now), (1, 0))
+
+
+class AcknowledgementQueryCountTests(TestCase):
+    """Query counts of the acknowledgement write paths and admin lists, which must not grow per row."""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        customer = Customer.objects.create(name='Acme')
+        customer_compliance = CustomerCompliance.objects.create(
+            customer=customer, compliance=Compliance.objects.create(compliance_title='ISO 27001')
+        )
+        template = Template.objects.create(name='Security', version_number=1, is_latest=True)
+        cls.policies = [
+            Policy.objects.create(title=f'Policy {i}', template=template, customer_compliance=customer_compliance)
+            for i in range(3)
+        ]
+        employees = [
+            Employee.objects.create(name=f'Employee {i}', email=f'e{i}@example.com', customer=customer, role='dev',
+                                    join_date=now)
+            for i in range(3)
+        ]
+        cls.acknowledgements = [
+            Acknowledgement.objects.create(policy=policy, employee=employee, acknowledgement_type='periodic')
+            for policy in cls.policies for employee in employees
+        ]
+        for policy in cls.policies:
+            PolicyConfiguration.objects.create(policy=policy, key='reminder_days', value=7)
+        History.objects.bulk_create([
+            History(acknowledgement=acknowledgement, field='status', old_value='pending', new_value='acknowledged',
+                    updated_at=now)
+            for acknowledgement in cls.acknowledgements
+        ])
+        cls.superuser = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def acknowledge(self, acknowledgement):
+        acknowledgement.status = 'acknowledged'
+        acknowledgement.acknowledged_at = timezone.now()
+        acknowledgement.save()
+
+    def test_status_update_with_related_rows_loaded(self):
+        # As loaded by acknowledgement_view: the UPDATE, the two counter updates (in their own savepoint) and the
+        # confirmation email inside save()'s savepoint, then the History insert on commit
+        acknowledgement = Acknowledgement.objects.select_related('employee', 'policy__customer_compliance').get(
+            pk=self.acknowledgements[0].pk
+        )
+        with self.assertNumQueries(9), self.captureOnCommitCallbacks(execute=True):
+            self.acknowledge(acknowledgement)
+        self.assertEqual(History.objects.filter(acknowledgement=acknowledgement, field='acknowledged_at').count(), 1)
+
+    def test_update_without_related_rows_reads_only_the_customer_ids(self):
+        # The Policy is not loaded: one values_list read of its customer compliance and customer instead
+        acknowledgement = Acknowledgement.objects.get(pk=self.acknowledgements[0].pk)
+        acknowledgement.escalation_status = 'escalated_to_hr'
+        with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+            acknowledgement.save()
+
+    def test_history_of_a_transaction_is_written_with_one_insert(self):
+        acknowledgements = list(Acknowledgement.objects.select_related('employee', 'policy__customer_compliance'))
+        # SAVEPOINT, UPDATE and RELEASE per save inside the outer savepoint, then a single History insert
+        with self.assertNumQueries(3 * len(acknowledgements) + 3), self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for acknowledgement in acknowledgements:
+                    acknowledgement.escalation_status = 'escalated_to_hr'
+                    acknowledgement.save()
+        self.assertEqual(History.objects.filter(field='escalation_status').count(), len(acknowledgements))
+
+    def test_audited_queryset_update_does_not_grow_with_rows(self):
+        for policy in self.policies[:1], self.policies:
+            with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+                Acknowledgement.objects.filter(policy__in=policy).update(escalation_status='escalated_to_cxo')
+
+    def test_admin_changelists_do_not_query_per_row(self):
+        # Two counts (filtered and total) and the page itself, whatever the number of rows
+        request = RequestFactory().get('/')
+        request.user = self.superuser
+        for model in Employee, Policy, PolicyConfiguration, Acknowledgement, History:
+            with self.subTest(model=model.__name__), self.assertNumQueries(3):
+                changelist = admin.site._registry[model].get_changelist_instance(request)
+                changelist.formset = None
+                list(results(changelist))
+
+
+class LatestTemplateCacheTests(TransactionTestCase):
+    def test_version_read_in_a_rolled_back_transaction_is_not_cached(self):
+        customer_compliance = CustomerCompliance.objects.create(
+            customer=Customer.objects.create(name='Acme'),
+            compliance=Compliance.objects.create(compliance_title='ISO 27001'),
+        )
+        first = Template.objects.create(name='Security', version_number=1, is_latest=True)
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Template.objects.create(name='Security', version_number=2, is_latest=True)
+            Policy.objects.create(title='Draft', template=first, customer_compliance=customer_compliance)
+            raise RuntimeError('rolled back')
+
+        self.assertEqual(Template.latest_version('Security'), (first.pk, 1))
+        policy = Policy.objects.create(title='Policy', template=first, customer_compliance=customer_compliance)
+        self.assertEqual((policy.template_id, policy.version), (first.pk, 1))
+
+
+class PolicyConfigurationSnapshotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        customer_compliance = CustomerCompliance.objects.create(
+            customer=Customer.objects.create(name='Acme'),
+            compliance=Compliance.objects.create(compliance_title='ISO 27001'),
+        )
+        template = Template.objects.create(name='Security', version_number=1, is_latest=True)
+        cls.policy = Policy.objects.create(title='Policy', template=template, customer_compliance=customer_compliance)
+        for key, value in ('reminder_days', '7'), ('sla_days', '30'):
+            PolicyConfiguration.objects.create(policy=cls.policy, key=key, value=value, status='active')
+
+    def effective(self):
+        return PolicyConfigurationSnapshot.effective(self.policy.pk).configuration
+
+    def test_queryset_update_refreshes_snapshots(self):
+        PolicyConfiguration.objects.filter(key='sla_days').update(status='rejected')
+        self.assertEqual(self.effective(), {'reminder_days': '7'})
+
+    def test_queryset_delete_refreshes_snapshots(self):
+        PolicyConfiguration.objects.filter(key='reminder_days').delete()
+        self.assertEqual(self.effective(), {'sla_days': '30'})
+
+
+class ComplianceCatalogTests(TestCase):
+    def setUp(self):
+        self.compliance = Compliance.objects.create(compliance_title='ISO 27001')
+        self.catalog = catalog_cache('compliances')
+
+    def assertBumps(self, write):
+        generation = self.catalog.generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+        self.assertNotEqual(self.catalog.generation(), generation)
+
+    def test_queryset_update_bumps_the_catalog(self):
+        self.assertBumps(lambda: Compliance.objects.filter(pk=self.compliance.pk).update(compliance_title='SOC 2'))
+
+    def test_queryset_soft_and_hard_delete_bump_the_catalog(self):
+        self.assertBumps(Compliance.objects.filter(pk=self.compliance.pk).delete)
+        self.assertBumps(Compliance.all_objects.filter(pk=self.compliance.pk).hard_delete)
+
+
+class AcknowledgementAssignViewTests(TestCase):
+    def assign(self, data):
+        return acknowledgement_assign_view(APIRequestFactory().post('/', data, format='json'))
+
+    def test_non_numeric_ids_are_rejected(self):
+        policy = Policy.objects.create(title='Policy', template=Template.objects.create(name='Security'))
+        for data in {'policy': 'abc'}, {'policy': policy.pk, 'customer': 'abc'}:
+            with self.subTest(data=data):
+                self.assertEqual(self.assign(data).status_code, 400)
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        reset_request_stats()
+        self.addCleanup(reset_request_stats)
+        self.request = RequestFactory().get('/export/')
+
+    def test_streaming_response_is_recorded_once_consumed(self):
+        def body():
+            for template in Template.objects.all():
+                yield template.name
+            yield str(Template.objects.count())
+
+        middleware = QueryInstrumentationMiddleware(lambda request: StreamingHttpResponse(body()))
+        response = middleware(self.request)
+        self.assertEqual(request_stats(), {})
+        b''.join(response.streaming_content)
+        self.assertEqual(request_stats()['GET unresolved']['max_queries'], 2)
+        self.assertNotIn('Server-Timing', response)
+
+    async def test_async_streaming_response_is_recorded_once_consumed(self):
+        async def body():
+            yield str(await Template.objects.acount())
+
+        async def get_response(request):
+            return StreamingHttpResponse(body())
+
+        middleware = QueryInstrumentationMiddleware(get_response)
+        response = await middleware(self.request)
+        self.assertEqual([chunk async for chunk in response.streaming_content], [b'0'])
+        self.assertEqual(request_stats()['GET unresolved']['max_queries'], 1)
+
+
+class ArchiveHistoryTests(TestCase):
+    def test_rows_inside_the_commit_window_are_not_archived(self):
+        with self.assertRaises(ValueError):
+            archive_history(timezone.now(), directory='unused')
+
+
+class ComplianceSummaryTests(TestCase):
+    def test_overdue_count_matches_overdue_at_the_boundary(self):
+        customer = Customer.objects.create(name='Acme')
+        policy = Policy.objects.create(
+            title='Policy', template=Template.objects.create(name='Security'),
+            customer_compliance=CustomerCompliance.objects.create(
+                customer=customer, compliance=Compliance.objects.create(compliance_title='ISO 27001')
+            ),
+        )
+        employee = Employee.objects.create(name='Employee', email='e@example.com', customer=customer, role='dev',
+                                           join_date=timezone.now())
+        Acknowledgement.objects.create(policy=policy, employee=employee, acknowledgement_type='periodic')
+        now = timezone.now()
+        Acknowledgement.objects.update(due_date=now)
+
+        [row] = Acknowledgement.compliance_summary(now=now)
+        self.assertEqual(row['overdue'], Acknowledgement.objects.overdue(now).count())
+        self.assertEqual(row['overdue'], 1)
@@ -1,5 +1,10 @@
 from policy.views import hello_world
 from policy.views import get_customers, get_compliance, manage_templates, employee_view, policy_view, acknowledgement_view, customer_compliance_view, manage_policy_configurations
+from policy.views import acknowledgement_export_view, history_export_view, acknowledgement_assign_view, compliance_dashboard_view
+from policy.views import acknowledgement_bulk_acknowledge_view, history_archive_view, catalog_cache_stats_view
+from policy.views import employee_bulk_upsert_view, request_stats_view, object_cache_stats_view, effective_policy_configuration_view
+from policy.async_views import async_policy_list, async_policy_detail, async_template_list, async_template_detail
+from policy.async_views import async_acknowledgement_list, async_acknowledgement_detail, async_customer_compliance_list, async_customer_compliance_detail
 from django.urls import path
 
 urlpatterns = [
@@ -10,11 +15,32 @@ urlpatterns = [
     path('templates/', manage_templates, name='manage_templates'),
     # path('template-versions/', manage_template_versions, name='manage_template_versions'),
     path('employees/', employee_view, name='employee_view'),
+    path('employees/bulk/', employee_bulk_upsert_view, name='employee_bulk_upsert'),
     path('policies/', policy_view, name='policy-list-create'),
     # path('customer_policies/', customer_policy_view, name='customer_policy_view'),
     path('acknowledgements/', acknowledgement_view, name='acknowledgement_list_create'),
     path('customer-compliance/', customer_compliance_view, name='customer_compliance_view'),
     path('manage-policy-configurations/', manage_policy_configurations, name='manage_policy_configurations'),
+    path('manage-policy-configurations/effective/', effective_policy_configuration_view, name='effective_policy_configuration'),
+    path('acknowledgements/assign/', acknowledgement_assign_view, name='acknowledgement_assign'),
+    path('acknowledgements/acknowledge/', acknowledgement_bulk_acknowledge_view, name='acknowledgement_bulk_acknowledge'),
+    path('compliance-dashboard/', compliance_dashboard_view, name='compliance_dashboard'),
+    path('exports/acknowledgements/', acknowledgement_export_view, name='acknowledgement_export'),
+    path('exports/history/', history_export_view, name='history_export'),
+    path('exports/history/archive/', history_archive_view, name='history_archive'),
+    path('stats/requests/', request_stats_view, name='request_stats'),
+    path('stats/object-cache/', object_cache_stats_view, name='object_cache_stats'),
+    path('stats/catalog-cache/', catalog_cache_stats_view, name='catalog_cache_stats'),
+
+    # Async (ASGI) read endpoints; same bodies as the sync list views above
+    path('async/policies/', async_policy_list, name='async_policy_list'),
+    path('async/policies/<int:pk>/', async_policy_detail, name='async_policy_detail'),
+    path('async/templates/', async_template_list, name='async_template_list'),
+    path('async/templates/<int:pk>/', async_template_detail, name='async_template_detail'),
+    path('async/acknowledgements/', async_acknowledgement_list, name='async_acknowledgement_list'),
+    path('async/acknowledgements/<int:pk>/', async_acknowledgement_detail, name='async_acknowledgement_detail'),
+    path('async/customer-compliance/', async_customer_compliance_list, name='async_customer_compliance_list'),
+    path('async/customer-compliance/<int:pk>/', async_customer_compliance_detail, name='async_customer_compliance_detail'),
     
     
     # Backend APIs for business logic operations
@@ -2,14 +2,108 @@ from datetime import timedelta
 from django.utils import timezone
 
 from django.shortcuts import get_object_or_404
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, parser_classes
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 from django.core.exceptions import ValidationError
-from django.http import JsonResponse
-
-from .models import Customer, Compliance, Template, Employee, Policy, Acknowledgement, CustomerCompliance, PolicyConfiguration
-from .serializers import CommonSerializer
+from django.http import Http404, HttpResponse, JsonResponse
+from django.core.cache import cache
+
+from .models import Customer, Compliance, Template, Employee, Policy, Acknowledgement, CustomerCompliance, PolicyConfiguration, History
+from .models import PolicyConfigurationSnapshot
+from .serializers import serializer_for, InvalidFieldSelection
+from .pagination import paginate, InvalidPageRequest
+from .conditional import list_validators, not_modified_response, set_validators
+from .onboarding import InvalidUpload, upsert_employees
+from .parsers import CSVStreamParser
+from .instrumentation import request_stats
+from .caching import COMPLIANCE_DASHBOARD_CACHE_TIMEOUT, compliance_dashboard_key, object_cache, object_cache_stats
+from .caching import catalog_cache, catalog_cache_stats
+from .exports import (
+    ACKNOWLEDGEMENT_EXPORT_COLUMNS, HISTORY_EXPORT_COLUMNS, InvalidExportRequest, parse_days, parse_export_filters,
+    streaming_export, streaming_rows,
+)
+from .archive import HISTORY_ARCHIVE_COLUMNS, read_history_archive
+
+
+def project(queryset, fields):
+    """Load only the requested columns, plus the keys that ordering and cursors rely on."""
+    if fields is None:
+        return queryset
+    return queryset.only('id', 'created_at', *fields)
+
+
+def get_cached(model, pk, **conditions):
+    """Read-only point lookup through the model's object cache, or the database when the model is not cached."""
+    store = object_cache(model)
+    if store is None:
+        return model.objects.get(pk=pk, **conditions)
+    return store.get(pk, **conditions)
+
+
+def get_cached_or_404(model, pk, **conditions):
+    try:
+        return get_cached(model, pk, **conditions)
+    except model.DoesNotExist:
+        raise Http404(f"No {model._meta.object_name} matches the given query.")
+
+
+def list_response(request, queryset, model):
+    """
+    Serialize a list endpoint's queryset.
+    When the client sends `page_size` or `cursor`, only one keyset page is read and returned with its `next_cursor`.
+    Responses carry ETag/Last-Modified, and a matching conditional GET gets a 304 before anything is serialized.
+    """
+    try:
+        etag, last_modified = list_validators(request, queryset)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        body = list_body(request, queryset, model)
+    except (InvalidFieldSelection, InvalidPageRequest) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return set_validators(Response(body), etag, last_modified)
+
+
+def list_body(request, queryset, model):
+    """
+    The serialized list, or one keyset page of it as {"results", "next_cursor"}.
+    Raises InvalidFieldSelection or InvalidPageRequest for bad `fields`/pagination parameters.
+    """
+    fields = serializer_for(model).parse_fields(request.query_params.get('fields'))
+    page = paginate(request, project(queryset, fields))
+    if page is None:
+        return serializer_for(model)(project(queryset, fields), many=True, fields=fields).data
+
+    rows, next_cursor = page
+    serializer = serializer_for(model)(rows, many=True, fields=fields)
+    return {"results": serializer.data, "next_cursor": next_cursor}
+
+
+def catalog_list_response(request, catalog, queryset, model):
+    """
+    list_response served from the catalog's versioned response cache as pre-rendered JSON.
+    A hit reads the catalog generation and copies the stored bytes; only a miss queries and serializes.
+    Other renderers negotiated by DRF (the browsable API, ?format=api) get the uncached list_response.
+    """
+    store = catalog_cache(catalog)
+    if store is None or request.accepted_renderer.format != 'json':
+        return list_response(request, queryset, model)
+
+    def render():
+        etag, last_modified = list_validators(request, queryset)
+        return JSONRenderer().render(list_body(request, queryset, model)), etag, last_modified
+
+    try:
+        content, etag, last_modified = store.get(request.get_full_path(), render)
+    except (InvalidFieldSelection, InvalidPageRequest) as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    return set_validators(HttpResponse(content, content_type='application/json'), etag, last_modified)
 
 
 @api_view(['GET', 'POST'])
@@ -23,11 +117,8 @@ def hello_world(request):
 def get_customers(request):
     if request.method == 'GET':
         # Fetch all customers that are not deleted
-        customers = Customer.objects.filter(is_deleted=False)
-        
-        # Dynamically set the model for the serializer
-        serializer = CommonSerializer(instance=customers, many=True, model=Customer)
-        return Response(serializer.data)
+        customers = Customer.objects.all()
+        return list_response(request, customers, Customer)
     
     elif request.method == 'POST':
         customer_id = request.data.get('id')
@@ -35,10 +126,10 @@ def get_customers(request):
         if customer_id:
             try:
                 # Fetch the existing customer by ID
-                customer = Customer.objects.get(id=customer_id, is_deleted=False)
+                customer = Customer.objects.get(id=customer_id)
                 
                 # Update the customer details using the provided data
-                serializer = CommonSerializer(instance=customer, data=request.data, model=Customer, partial=True)
+                serializer = serializer_for(Customer)(instance=customer, data=request.data, partial=True)
                 
                 if serializer.is_valid():
                     serializer.save()  # Save updated customer details
@@ -52,11 +143,11 @@ def get_customers(request):
         else:
             # Validate if a customer with the same name already exists
             customer_name = request.data.get('name')
-            if Customer.objects.filter(name=customer_name, is_deleted=False).exists():
+            if Customer.objects.filter(name=customer_name).exists():
                 return Response({"error": "A customer with this name already exists."}, status=status.HTTP_400_BAD_REQUEST)
             
             # If no existing customer, create a new customer
-            serializer = CommonSerializer(data=request.data, model=Customer)
+            serializer = serializer_for(Customer)(data=request.data)
             
             if serializer.is_valid():
                 new_customer = serializer.save()  # Save the new customer
@@ -69,13 +160,8 @@ def get_customers(request):
 def get_compliance(request):
     if request.method == 'GET':
         # Fetch all non-deleted compliance records
-        compliances = Compliance.objects.filter(is_deleted=False)
-        
-        # Use CommonSerializer dynamically with the Compliance model
-        serializer = CommonSerializer(compliances, many=True, model=Compliance)
-        
-        # Return the response
-        return Response(serializer.data)
+        compliances = Compliance.objects.all()
+        return catalog_list_response(request, 'compliances', compliances, Compliance)
     
     elif request.method == 'POST':
         data = request.data
@@ -84,10 +170,10 @@ def get_compliance(request):
         if compliance_id:
             try:
                 # Fetch existing compliance for update
-                compliance = Compliance.objects.get(id=compliance_id, is_deleted=False)
+                compliance = Compliance.objects.get(id=compliance_id)
                 
                 # Update fields dynamically
-                serializer = CommonSerializer(instance=compliance, data=data, model=Compliance, partial=True)
+                serializer = serializer_for(Compliance)(instance=compliance, data=data, partial=True)
                 
                 if serializer.is_valid():
                     serializer.save()
@@ -101,11 +187,11 @@ def get_compliance(request):
         compliance_title = data.get('compliance_title')
         
         # Ensure the compliance title is unique
-        if Compliance.objects.filter(compliance_title=compliance_title, is_deleted=False).exists():
+        if Compliance.objects.filter(compliance_title=compliance_title).exists():
             return Response({"error": "Compliance with this title already exists."}, status=status.HTTP_400_BAD_REQUEST)
         
         # Create a new compliance
-        serializer = CommonSerializer(data=data, model=Compliance)
+        serializer = serializer_for(Compliance)(data=data)
         if serializer.is_valid():
             compliance = serializer.save()
             return Response({"message": "Compliance created successfully", "id": compliance.id}, status=status.HTTP_201_CREATED)
@@ -118,8 +204,7 @@ def manage_templates(request):
     if request.method == 'GET':
         # Fetch all active templates
         templates = Template.objects.filter(is_active=True)
-        serializer = CommonSerializer(templates, model=Template, many=True)
-        return Response(serializer.data)
+        return catalog_list_response(request, 'templates', templates, Template)
 
     elif request.method == 'POST':
         template_id = request.data.get('id')
@@ -130,13 +215,13 @@ def manage_templates(request):
             # Updating an existing template
             try:
                 template = Template.objects.get(id=template_id, is_active=True)
-                serializer = CommonSerializer(template, data=request.data, partial=True, model=Template)
+                serializer = serializer_for(Template)(template, data=request.data, partial=True)
 
                 if serializer.is_valid():
                     serializer.save()
 
-                    # Handle `is_latest` logic
-                    if is_latest:
+                    # Handle `is_latest` logic (already applied if it was saved through the serializer)
+                    if is_latest and not template.is_latest:
                         template.is_latest = True
                         template.save()
 
@@ -147,14 +232,13 @@ def manage_templates(request):
                 return Response({"error": "Template not found or is inactive."}, status=status.HTTP_404_NOT_FOUND)
         else:
             # Creating a new template (assumes a new version of an existing template or a brand-new template)
-            serializer = CommonSerializer(data=request.data, model=Template)
+            serializer = serializer_for(Template)(data=request.data)
 
             if serializer.is_valid():
                 new_template = serializer.save()
 
-                # Handle `is_latest` and ensure only one is marked latest
-                if is_latest:
-                    Template.objects.filter(name=new_template.name).update(is_latest=False)
+                # Handle `is_latest`; Template.save() ensures only one is marked latest
+                if is_latest and not new_template.is_latest:
                     new_template.is_latest = True
                     new_template.save()
 
@@ -168,7 +252,7 @@ def manage_templates(request):
 #     if request.method == 'GET':
 #         # Fetch all template versions
 #         template_versions = TemplateVersion.objects.all()
-#         serializer = CommonSerializer(instance=template_versions, many=True, model=TemplateVersion)
+#         serializer = serializer_for(TemplateVersion)(instance=template_versions, many=True)
 #         return Response(serializer.data)
 
 #     elif request.method == 'POST':
@@ -178,7 +262,7 @@ def manage_templates(request):
 #         if version_id:
 #             try:
 #                 version = TemplateVersion.objects.get(id=version_id)
-#                 serializer = CommonSerializer(instance=version, data=request.data, model=TemplateVersion, partial=True)
+#                 serializer = serializer_for(TemplateVersion)(instance=version, data=request.data, partial=True)
 #                 if serializer.is_valid():
 #                     serializer.save()
 #                     return Response(serializer.data, status=status.HTTP_200_OK)
@@ -202,7 +286,7 @@ def manage_templates(request):
 #         data['template'] = template.id
 #         data['version_number'] = new_version_number
 
-#         serializer = CommonSerializer(data=data, model=TemplateVersion)
+#         serializer = serializer_for(TemplateVersion)(data=data)
 #         if serializer.is_valid():
 #             serializer.save()
 #             return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -212,10 +296,9 @@ def manage_templates(request):
 @api_view(['GET', 'POST'])
 def employee_view(request):
     if request.method == 'GET':
-        # Fetch all non-deleted employees for customers that are not deleted
-        employees = Employee.objects.filter(customer__is_deleted=False)
-        serializer = CommonSerializer(employees, model=Employee, many=True)
-        return Response(serializer.data)
+        # Fetch employees of customers that are not deleted (denormalized flag, no join)
+        employees = Employee.objects.live()
+        return list_response(request, employees, Employee)
 
     elif request.method == 'POST':
         employee_id = request.data.get('id')
@@ -223,8 +306,8 @@ def employee_view(request):
         if employee_id:
             # Updating an existing employee
             try:
-                employee = Employee.objects.get(id=employee_id, customer__is_deleted=False)
-                serializer = CommonSerializer(employee, data=request.data, partial=True, model=Employee)
+                employee = Employee.objects.live().get(id=employee_id)
+                serializer = serializer_for(Employee)(employee, data=request.data, partial=True)
 
                 if serializer.is_valid():
                     serializer.save()
@@ -236,9 +319,9 @@ def employee_view(request):
         else:
             # Creating a new employee
             customer_id = request.data.get('customer')
-            customer = get_object_or_404(Customer, id=customer_id, is_deleted=False)
+            customer = get_cached_or_404(Customer, customer_id, is_deleted=False)
 
-            serializer = CommonSerializer(data=request.data, model=Employee)
+            serializer = serializer_for(Employee)(data=request.data)
 
             if serializer.is_valid():
                 serializer.save()
@@ -247,13 +330,30 @@ def employee_view(request):
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['POST'])
+@parser_classes([JSONParser, CSVStreamParser])
+def employee_bulk_upsert_view(request):
+    # Nightly HRIS sync: a JSON array or CSV of employees keyed by email
+    if isinstance(request.data, list) or request.content_type.startswith('text/csv'):
+        rows = request.data
+    else:
+        return Response({"error": "Send a JSON array or a text/csv body of employees."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        report = upsert_employees(rows)
+    except InvalidUpload as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    response_status = status.HTTP_200_OK if not report["failed"] else status.HTTP_207_MULTI_STATUS
+    return Response(report, status=response_status)
+
+
 @api_view(['GET', 'POST', 'PUT'])
 def policy_view(request):
     if request.method == 'GET':
         # Fetch all policies with active status
-        policies = Policy.objects.filter(is_deleted=False)  # Assuming 'is_deleted' is a boolean field
-        serializer = CommonSerializer(policies, model=Policy, many=True)
-        return Response(serializer.data)
+        policies = Policy.objects.all()
+        return list_response(request, policies, Policy)
 
     elif request.method == 'POST':
         # Creating a new policy
@@ -267,19 +367,18 @@ def policy_view(request):
             if not template_id:
                 return Response({"error": "Template is required for default policies."}, status=status.HTTP_400_BAD_REQUEST)
 
-            try:
-                template = Template.objects.get(id=template_id, is_latest=True)
-            except Template.DoesNotExist:
-                return Response({"error": "Template not found or is not the latest version."}, status=status.HTTP_404_NOT_FOUND)
-
             # Create the default policy
-            request.data['version'] = template.version_number  # Set version from template
             request.data['approval_status'] = 'pending'  # Default is 'pending' approval status
-            serializer = CommonSerializer(data=request.data, model=Policy)
+            serializer = serializer_for(Policy)(data=request.data)
 
             if serializer.is_valid():
-                # Create the policy, setting the template
-                serializer.save(template=template)
+                # The serializer has already loaded the template; check it is the latest without querying again
+                template = serializer.validated_data.get('template')
+                if template is None or not template.is_latest:
+                    return Response({"error": "Template not found or is not the latest version."}, status=status.HTTP_404_NOT_FOUND)
+
+                # Create the policy, setting the template and its version
+                serializer.save(template=template, version=template.version_number)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             else:
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -294,13 +393,13 @@ def policy_view(request):
                                  status=status.HTTP_400_BAD_REQUEST)
 
             try:
-                created_by = Employee.objects.get(id=created_by_id)
+                created_by = get_cached(Employee, created_by_id)
             except Employee.DoesNotExist:
                 return Response({"error": "Employee not found."}, status=status.HTTP_404_NOT_FOUND)
 
             # Create the custom policy
             request.data['approval_status'] = 'pending'  # Default is 'pending' approval status
-            serializer = CommonSerializer(data=request.data, model=Policy)
+            serializer = serializer_for(Policy)(data=request.data)
 
             if serializer.is_valid():
                 serializer.save(created_by=created_by)
@@ -330,7 +429,7 @@ def policy_view(request):
             elif approval_status == 'rejected':
                 policy.approved_at = None  # Reset the approval timestamp if rejected
 
-        serializer = CommonSerializer(policy, data=request.data, partial=True, model=Policy)
+        serializer = serializer_for(Policy)(policy, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -343,8 +442,7 @@ def manage_policy_configurations(request):
     if request.method == 'GET':
         # Fetch all policy configurations
         policy_configurations = PolicyConfiguration.objects.all()
-        serializer = CommonSerializer(policy_configurations, model=PolicyConfiguration, many=True)
-        return Response(serializer.data)
+        return list_response(request, policy_configurations, PolicyConfiguration)
 
     elif request.method == 'POST':
         # Check for ID in the request data to update or create
@@ -354,7 +452,7 @@ def manage_policy_configurations(request):
             try:
                 # Updating an existing configuration
                 policy_config = PolicyConfiguration.objects.get(id=config_id)
-                serializer = CommonSerializer(policy_config, data=request.data, partial=True, model=PolicyConfiguration)
+                serializer = serializer_for(PolicyConfiguration)(policy_config, data=request.data, partial=True)
 
                 if serializer.is_valid():
                     serializer.save()  # Save the updated configuration
@@ -371,12 +469,12 @@ def manage_policy_configurations(request):
 
             # Ensure that the policy exists
             try:
-                policy = Policy.objects.get(id=policy_id)
+                policy = get_cached(Policy, policy_id)
             except Policy.DoesNotExist:
                 return Response({"error": "Policy not found."}, status=status.HTTP_404_NOT_FOUND)
 
             # Creating the policy configuration
-            serializer = CommonSerializer(data=request.data, model=PolicyConfiguration)
+            serializer = serializer_for(PolicyConfiguration)(data=request.data)
 
             if serializer.is_valid():
                 # Save the configuration and trigger versioning
@@ -386,12 +484,29 @@ def manage_policy_configurations(request):
                 return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+def effective_policy_configuration_view(request):
+    # The configuration in force for a policy, at its latest or a given version, from one snapshot read
+    policy_id = request.query_params.get('policy')
+    version = request.query_params.get('version')
+    if not policy_id or not policy_id.isdigit():
+        return Response({"error": "Policy must be an id."}, status=status.HTTP_400_BAD_REQUEST)
+    if version is not None and not version.isdigit():
+        return Response({"error": "Version must be a positive integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+    snapshot = PolicyConfigurationSnapshot.effective(policy_id, int(version) if version is not None else None)
+    return Response({
+        "policy": int(policy_id),
+        "version": snapshot.version if snapshot else None,
+        "configuration": snapshot.configuration if snapshot else {},
+    }, status=status.HTTP_200_OK)
+
 # @api_view(['GET', 'POST'])
 # def customer_policy_view(request):
 #     if request.method == 'GET':
 #         # Fetch all active customer policies
 #         policies = CustomerPolicy.objects.all()
-#         serializer = CommonSerializer(policies, model=CustomerPolicy, many=True)
+#         serializer = serializer_for(CustomerPolicy)(policies, many=True)
 #         return Response(serializer.data)
 
 #     elif request.method == 'POST':
@@ -401,7 +516,7 @@ def manage_policy_configurations(request):
 #             # Update an existing CustomerPolicy
 #             try:
 #                 customer_policy = CustomerPolicy.objects.get(id=policy_id)
-#                 serializer = CommonSerializer(customer_policy, data=request.data, partial=True, model=CustomerPolicy)
+#                 serializer = serializer_for(CustomerPolicy)(customer_policy, data=request.data, partial=True)
 
 #                 if serializer.is_valid():
 #                     serializer.save()
@@ -425,7 +540,7 @@ def manage_policy_configurations(request):
 #                 return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 #             # Create new CustomerPolicy entry
-#             serializer = CommonSerializer(data=request.data, model=CustomerPolicy)
+#             serializer = serializer_for(CustomerPolicy)(data=request.data)
 #             if serializer.is_valid():
 #                 serializer.save()
 #                 return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -437,25 +552,41 @@ def acknowledgement_view(request, pk=None):
     if request.method == 'GET':
         # Retrieve all acknowledgements
         acknowledgements = Acknowledgement.objects.all()
-        serializer = CommonSerializer(acknowledgements, many=True, model=Acknowledgement)
-        return Response({
-            "message": "Acknowledgements retrieved successfully",
-            "data": serializer.data
-        }, status=status.HTTP_200_OK)
+        try:
+            etag, last_modified = list_validators(request, acknowledgements)
+            not_modified = not_modified_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            fields = serializer_for(Acknowledgement).parse_fields(request.query_params.get('fields'))
+            acknowledgements = project(acknowledgements, fields)
+            page = paginate(request, acknowledgements)
+        except (InvalidFieldSelection, InvalidPageRequest) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        body = {"message": "Acknowledgements retrieved successfully"}
+        if page is not None:
+            acknowledgements, body["next_cursor"] = page
+        serializer = serializer_for(Acknowledgement)(acknowledgements, many=True, fields=fields)
+        body["data"] = serializer.data
+        return set_validators(Response(body, status=status.HTTP_200_OK), etag, last_modified)
 
     elif request.method == 'POST':
         # If an 'id' is present in the request data, it's for updating an existing record
         if 'id' in request.data:
             try:
                 # Retrieve the existing Acknowledgement
-                acknowledgement = Acknowledgement.objects.get(id=request.data['id'])
+                # employee and policy are read by the serializer's unique-together validation, the customer
+                # compliance by save()'s counter update and dashboard invalidation
+                acknowledgement = Acknowledgement.objects.select_related('employee', 'policy__customer_compliance').get(
+                    id=request.data['id']
+                )
             except Acknowledgement.DoesNotExist:
                 return Response({
                     "error": "Acknowledgement not found."
                 }, status=status.HTTP_404_NOT_FOUND)
 
             # Use the serializer to update the existing record
-            serializer = CommonSerializer(acknowledgement, data=request.data, partial=True, model=Acknowledgement)
+            serializer = serializer_for(Acknowledgement)(acknowledgement, data=request.data, partial=True)
             if serializer.is_valid():
                 serializer.save()
                 return Response({
@@ -470,47 +601,210 @@ def acknowledgement_view(request, pk=None):
             # Creating a new Acknowledgement
             acknowledgement_data = request.data
 
+            # Validate first so the employee is fetched once, by the serializer's related field
+            serializer = serializer_for(Acknowledgement)(data=acknowledgement_data)
+            if not serializer.is_valid():
+                return Response({
+                    "error": serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
             # Validate acknowledgment for 'new_joiner' type
-            if acknowledgement_data.get('acknowledgement_type') == 'new_joiner':
-                try:
-                    # Retrieve the employee
-                    employee = Employee.objects.get(id=acknowledgement_data['employee'])
-                    
-                    # Check if the employee joined within 30 days
-                    join_date = employee.created_at
-                    if join_date + timedelta(days=30) < timezone.now():
-                        raise ValidationError("Acknowledgement for new joiner must be completed within 30 days of joining.")
-                except Employee.DoesNotExist:
-                    return Response({
-                        "error": "Employee not found."
-                    }, status=status.HTTP_404_NOT_FOUND)
-                except ValidationError as e:
+            if serializer.validated_data.get('acknowledgement_type') == 'new_joiner':
+                # Check if the employee joined within 30 days
+                join_date = serializer.validated_data['employee'].created_at
+                if join_date + timedelta(days=30) < timezone.now():
                     return Response({
-                        "error": str(e)
+                        "error": "Acknowledgement for new joiner must be completed within 30 days of joining."
                     }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Now, create the acknowledgement
-            serializer = CommonSerializer(data=acknowledgement_data, model=Acknowledgement)
-            if serializer.is_valid():
+            try:
                 # Create new acknowledgement entry
                 serializer.save()
+            except ValidationError as e:
                 return Response({
-                    "message": "Acknowledgement created successfully",
-                    "data": serializer.data
-                }, status=status.HTTP_201_CREATED)
+                    "error": e.messages
+                }, status=status.HTTP_400_BAD_REQUEST)
             return Response({
-                "error": serializer.errors
-            }, status=status.HTTP_400_BAD_REQUEST)
-            
-            
+                "message": "Acknowledgement created successfully",
+                "data": serializer.data
+            }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+def acknowledgement_assign_view(request):
+    # Roll a policy out to every matching employee of a customer in one request
+    policy_id = request.data.get('policy')
+    acknowledgement_type = request.data.get('acknowledgement_type', 'periodic')
+    employee_status = request.data.get('status', 'active')
+    role = request.data.get('role')
+
+    if not policy_id:
+        return Response({"error": "Policy is required."}, status=status.HTTP_400_BAD_REQUEST)
+    if acknowledgement_type not in dict(Acknowledgement.ACKNOWLEDGEMENT_TYPE_CHOICES):
+        return Response({"error": "Invalid acknowledgement type."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        policy = Policy.objects.select_related('customer_compliance').get(id=policy_id)
+    except ValueError:
+        return Response({"error": "Policy must be an id."}, status=status.HTTP_400_BAD_REQUEST)
+    except Policy.DoesNotExist:
+        return Response({"error": "Policy not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    # Default to the customer the policy was created for
+    customer_id = request.data.get('customer') or (
+        policy.customer_compliance.customer_id if policy.customer_compliance else None
+    )
+    if not customer_id:
+        return Response({"error": "Customer is required for policies not linked to a customer compliance."},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        customer = get_cached_or_404(Customer, customer_id, is_deleted=False)
+    except ValueError:
+        return Response({"error": "Customer must be an id."}, status=status.HTTP_400_BAD_REQUEST)
+
+    employees = Employee.objects.filter(customer=customer, status=employee_status)
+    if role:
+        employees = employees.filter(role=role)
+
+    created, skipped = Acknowledgement.bulk_assign(policy, employees, acknowledgement_type)
+    return Response({
+        "message": "Acknowledgements assigned successfully",
+        "created": created,
+        "skipped": skipped
+    }, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def acknowledgement_bulk_acknowledge_view(request):
+    # Acknowledge several (or "all") of an employee's pending acknowledgements with one confirmation email
+    employee_id = request.data.get('employee')
+    ids = request.data.get('ids')
+
+    if not employee_id:
+        return Response({"error": "Employee is required."}, status=status.HTTP_400_BAD_REQUEST)
+    if ids == 'all':
+        ids = None
+    elif not isinstance(ids, list) or not ids or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+        return Response({"error": 'Ids must be a non-empty list of acknowledgement ids or "all".'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        employee = get_cached_or_404(Employee, employee_id)
+    except ValueError:
+        return Response({"error": "Employee must be an id."}, status=status.HTTP_400_BAD_REQUEST)
+
+    acknowledged = Acknowledgement.bulk_acknowledge(employee, ids)
+    body = {
+        "message": "Acknowledgements acknowledged successfully",
+        "acknowledged": acknowledged,
+    }
+    if ids is not None:
+        # Requested ids that were not the employee's or were no longer pending
+        done = set(acknowledged)
+        body["skipped"] = [i for i in dict.fromkeys(ids) if i not in done]
+    return Response(body, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def compliance_dashboard_view(request):
+    # Acknowledged / pending / overdue / escalated counts per customer and compliance
+    customer_id = request.query_params.get('customer')
+    if customer_id and not customer_id.isdigit():
+        return Response({"error": "Customer must be an id."}, status=status.HTTP_400_BAD_REQUEST)
+    # ?customer=05 and ?customer=5 share one cache entry
+    customer_id = int(customer_id) if customer_id else None
+
+    cache_key = compliance_dashboard_key(customer_id)
+    summary = cache.get(cache_key) if COMPLIANCE_DASHBOARD_CACHE_TIMEOUT else None
+    if summary is None:
+        summary = Acknowledgement.compliance_summary(customer_id=customer_id)
+        if COMPLIANCE_DASHBOARD_CACHE_TIMEOUT:
+            cache.set(cache_key, summary, COMPLIANCE_DASHBOARD_CACHE_TIMEOUT)
+    return Response(summary)
+
+
+@api_view(['GET'])
+def request_stats_view(request):
+    # Per-view latency/query histograms recorded by QueryInstrumentationMiddleware in this process
+    return Response(request_stats())
+
+
+@api_view(['GET'])
+def object_cache_stats_view(request):
+    # Hit/miss counters of the read-through object caches in this process
+    return Response(object_cache_stats())
+
+
+@api_view(['GET'])
+def catalog_cache_stats_view(request):
+    # Hit ratio and regeneration time of the template/compliance response caches in this process
+    return Response(catalog_cache_stats())
+
+
+@api_view(['GET'])
+def acknowledgement_export_view(request):
+    # Stream acknowledgements for audits, filtered by customer, policy and created_at range,
+    # and optionally to rows overdue by at least `overdue` days or falling due within `due_within` days
+    try:
+        filters = parse_export_filters(
+            request.query_params, 'employee__customer_id', 'policy_id', 'created_at'
+        )
+        acknowledgements = Acknowledgement.objects.filter(**filters)
+        overdue_days = parse_days(request.query_params, 'overdue')
+        if overdue_days is not None:
+            acknowledgements = acknowledgements.overdue(days=overdue_days)
+        due_within_days = parse_days(request.query_params, 'due_within')
+        if due_within_days is not None:
+            acknowledgements = acknowledgements.due_within(due_within_days)
+        return streaming_export(
+            acknowledgements, ACKNOWLEDGEMENT_EXPORT_COLUMNS,
+            request.query_params.get('output', 'ndjson'), 'acknowledgements'
+        )
+    except InvalidExportRequest as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+def history_export_view(request):
+    # Stream the acknowledgement audit trail, filtered by customer, policy and updated_at range
+    try:
+        filters = parse_export_filters(
+            request.query_params, 'acknowledgement__employee__customer_id', 'acknowledgement__policy_id', 'updated_at'
+        )
+        history = History.objects.filter(**filters)
+        return streaming_export(
+            history, HISTORY_EXPORT_COLUMNS, request.query_params.get('output', 'ndjson'), 'history'
+        )
+    except InvalidExportRequest as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET'])
+def history_archive_view(request):
+    # Stream archived History rows (moved out by archive_history) with the history export's filters,
+    # plus `acknowledgement`; only the archive files for the requested months are read
+    try:
+        filters = parse_export_filters(request.query_params, 'customer_id', 'policy_id', 'updated_at')
+        acknowledgement_id = request.query_params.get('acknowledgement')
+        if acknowledgement_id:
+            if not acknowledgement_id.isdigit():
+                raise InvalidExportRequest("'acknowledgement' must be an id.")
+            filters['acknowledgement_id'] = int(acknowledgement_id)
+        return streaming_rows(
+            read_history_archive(filters), HISTORY_ARCHIVE_COLUMNS,
+            request.query_params.get('output', 'ndjson'), 'history-archive'
+        )
+    except InvalidExportRequest as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
 # API view function for handling CustomerCompliance
 @api_view(['GET', 'POST'])
 def customer_compliance_view(request):
     if request.method == 'GET':
         # Fetch all active customer compliances
         customer_compliances = CustomerCompliance.objects.all()
-        serializer = CommonSerializer(customer_compliances, model=CustomerCompliance, many=True)
-        return Response(serializer.data)
+        return list_response(request, customer_compliances, CustomerCompliance)
 
     elif request.method == 'POST':
         customer_compliance_id = request.data.get('id') or request.query_params.get('id')  # Get id from body or query param
@@ -519,7 +813,7 @@ def customer_compliance_view(request):
             # Updating an existing customer compliance
             try:
                 customer_compliance = CustomerCompliance.objects.get(id=customer_compliance_id)
-                serializer = CommonSerializer(customer_compliance, data=request.data, partial=True, model=CustomerCompliance)
+                serializer = serializer_for(CustomerCompliance)(customer_compliance, data=request.data, partial=True)
 
                 if serializer.is_valid():
                     serializer.save()
@@ -530,7 +824,7 @@ def customer_compliance_view(request):
                 return Response({"error": "Customer compliance not found."}, status=status.HTTP_404_NOT_FOUND)
         else:
             # Creating a new customer compliance
-            serializer = CommonSerializer(data=request.data, model=CustomerCompliance)
+            serializer = serializer_for(CustomerCompliance)(data=request.data)
 
             if serializer.is_valid():
                 serializer.save()